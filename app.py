@@ -1,22 +1,38 @@
 # Pour faire tourner le fichier app.py, il faut utiliser le fichier data_avec_labels.csv dans le dossier data
 
+import time
+run_started = time.perf_counter()  # temps jusqu'au premier affichage des métriques, voir plus bas
+
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import seaborn as sns
+from contextlib import closing
 from pathlib import Path
 from datetime import datetime
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_mistralai import ChatMistralAI
-import hashlib
-import os
-from dotenv import load_dotenv
+from dashboard.review_store import load_reviews
+from dashboard.shared_dataset import open_shared
+from dashboard.location_index import LocationIndex
+from dashboard.time_index import ReviewTimeIndex
+from dashboard.nps import DETRACTOR, PROMOTER, with_sentiment_codes
+from dashboard.nps_cube import NpsCube, restaurant_table, summarize
+from dashboard.topic_registry import TopicRegistry
+from dashboard.topic_index import TopicBitmapIndex
+from dashboard.comment_index import CommentIndex, page_payload
+from dashboard.reply_cache import ReplyCache
+from dashboard.llm_provider import LLMProvider, configured_backend
+from dashboard.topic_stats import ratios_from_counts
+from dashboard.figure_cache import FigureCache
+from dashboard import instrumentation
 
 # ============================== CONFIG ===================================
 DATA_PATH = Path("data\data_avec_labels.csv")
+# Columnar copy of DATA_PATH, built with `python -m dashboard.review_store`
+STORE_PATH = Path("data/data_avec_labels.parquet")
+# Memory-mapped copy shared by all sessions, built with `python -m dashboard.shared_dataset`
+SHARED_PATH = Path("data/data_avec_labels.arrow")
+DASHBOARD_SECTIONS = ("filters", "overview", "map", "topics", "comments")
+# Délai max (secondes) pour obtenir une réponse complète du LLM
+REPLY_TIMEOUT = 30
 
 # ============================== PAGE SETUP ==============================
 st.set_page_config(layout="wide", page_title="Restaurant Review Dashboard", page_icon="📊")
@@ -29,67 +45,143 @@ st.markdown("""
 
 
 # ============================== LABELISATION =============================
-# Rappel de la liste des labels utilisées par le model
-labels = [
-    'hygiene', 'food quality', 'food', 'staff', 'something is missing',
-    'location', 'speed of service', 'drive-thru', 'temperature of the food',
-    'atmosphere', 'customer service', "temperature" , "price", "speed", "quality", "courtesy",
-]
+# Rappel de la liste des labels utilisées par le model (registre dashboard/topics.json)
+topic_registry = TopicRegistry.load()
+labels = topic_registry.labels
 
 # ============================== LOAD DATA ==============================
 @st.cache_data
 def load_data(path: Path):
-    """Load review data from a CSV file with basic preprocessing."""
+    """Load review data from the Parquet store, or from a CSV file with basic preprocessing."""
     try:
+        if path.suffix == ".parquet":
+            return load_reviews(path, sections=DASHBOARD_SECTIONS)
         df = pd.read_csv(path)
         df.columns = df.columns.str.strip()  # Clean column names
         df.drop(columns=["Unnamed: 0"], errors="ignore", inplace=True)
         df["review_date"] = pd.to_datetime(df["review_date"])
-        return df
+        return with_sentiment_codes(df)
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return pd.DataFrame()
+
+
+@st.cache_resource
+def load_shared_data(path: Path):
+    """Memory-map the shared Arrow dataset (read-only, one copy for all sessions)."""
+    try:
+        return open_shared(path, sections=DASHBOARD_SECTIONS)
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
 
 
+def load_dataset(source: Path):
+    """Load the review data from the given source (shared Arrow file, Parquet store or CSV)."""
+    if source.suffix == ".arrow":
+        return load_shared_data(source)
+    return load_data(source)
+
+
+@st.cache_resource
+def load_location_index(source: Path):
+    """Build the State → City → Restaurant index once per data source."""
+    return LocationIndex.from_frame(load_dataset(source))
+
+
+@st.cache_resource
+def load_time_index(source: Path):
+    """Build the date-sorted review index once per data source."""
+    return ReviewTimeIndex(load_dataset(source))
+
+
+@st.cache_resource
+def load_nps_cube(source: Path):
+    """Aggregate sentiment counts by store × day once per data source."""
+    return NpsCube(load_dataset(source))
+
+
+@st.cache_resource
+def load_figure_cache():
+    """Plotly figures (JSON specs) shared by all sessions, keyed by filter state and chart."""
+    return FigureCache()
+
+
+@st.cache_data
+def load_map_layer(source: Path, filters: dict):
+    """US map bubbles (stores, NPS, size) from the cube, once per filter state."""
+    return load_nps_cube(source).map_layer(
+        filters["start_date"],
+        filters["end_date"],
+        filters["state"],
+        filters["city"],
+        filters["address"],
+    )
+
+
+@st.cache_resource
+def load_topic_index(source: Path, topic_labels: tuple, thresholds: tuple):
+    """Build the topic / sentiment bitmaps once per data source and thresholds."""
+    return TopicBitmapIndex(load_dataset(source), topic_labels, thresholds)
+
+
+@st.cache_resource
+def load_comment_index(source: Path):
+    """Sort the comments by score once per data source (per sentiment and per store)."""
+    return CommentIndex(load_dataset(source))
+
+
+def filter_bits(source: Path, filters: dict, topic_index):
+    """Bitmap of the rows matching the sidebar filters."""
+    return topic_index.row_bits(load_time_index(source).select(
+        filters["start_date"],
+        filters["end_date"],
+        filters["state"],
+        filters["city"],
+        filters["address"],
+    ))
+
+
+@st.cache_data
+def load_topic_ratios(source: Path, filters: dict, topic_labels: tuple, thresholds: tuple):
+    """Topic counts and ratios of the promoter/detractor reviews, once per filter state."""
+    topic_index = load_topic_index(source, topic_labels, thresholds)
+    row_bits = filter_bits(source, filters, topic_index)
+    return ratios_from_counts(
+        topic_index.counts(row_bits, PROMOTER),
+        topic_index.counts(row_bits, DETRACTOR),
+        topic_labels,
+    )
+
+
 # ============================== FILTER DATA ==============================
-def apply_filters(df):
-    """Apply hierarchical location and date filters via the sidebar."""
-    st.sidebar.header("📍 Location Filters")
+def apply_filters(location_index, time_index):
+    """Apply hierarchical location and date filters via the sidebar.
 
-    df["review_date"] = pd.to_datetime(df["review_date"])
+    Returns the row positions of the matching reviews (the rows themselves are
+    never copied: the sections read the cube and the indexes).
+    """
+    st.sidebar.header("📍 Location Filters")
 
     # === Select State ===
-    state_list = sorted(df["State"].dropna().unique())
-    selected_state = st.sidebar.selectbox("Select a State", ["All"] + state_list)
+    selected_state = st.sidebar.selectbox("Select a State", ["All"] + location_index.states)
 
     # === Select City (based on State) ===
-    if selected_state == "All":
-        city_list = sorted(df["City"].dropna().unique())
-    else:
-        city_list = sorted(df[df["State"] == selected_state]["City"].dropna().unique())
+    city_list = location_index.city_options(selected_state)
     selected_city = st.sidebar.selectbox("Select a City", ["All"] + city_list)
 
     # === Select Restaurant Address (based on State & City) ===
-    if selected_state == "All" and selected_city == "All":
-        address_list = sorted(df["store_address"].dropna().unique())
-    elif selected_city == "All":
-        address_list = sorted(df[df["State"] == selected_state]["store_address"].dropna().unique())
-    elif selected_state == "All":
-        address_list = sorted(df[df["City"] == selected_city]["store_address"].dropna().unique())
-    else:
-        address_list = sorted(df[(df["State"] == selected_state) & (df["City"] == selected_city)]["store_address"].dropna().unique())
+    address_list = location_index.address_options(selected_state, selected_city)
     selected_address = st.sidebar.selectbox("Select a Restaurant", ["All"] + address_list)
 
     # Update State and City based on selected address
     if selected_address != "All":
-        address_info = df[df["store_address"] == selected_address].iloc[0]
-        selected_state = address_info["State"]
-        selected_city = address_info["City"]
+        selected_state, selected_city = location_index.locate(selected_address)
 
     # === Date Filter ===
     st.sidebar.header("📆 Select a Period")
-    min_date = df["review_date"].min()
-    max_date = df["review_date"].max()
+    min_date = time_index.min_date
+    max_date = time_index.max_date
 
     # Apply filters
     start_date = st.sidebar.date_input(
@@ -108,16 +200,10 @@ def apply_filters(df):
     # Protect against bad input (e.g. end before start)
     if start_date > end_date:
         st.sidebar.error("❌ End date must be after start date.")
-        return pd.DataFrame()
-
-    filtered_df = df[(df["review_date"] >= pd.to_datetime(start_date)) & (df["review_date"] <= pd.to_datetime(end_date))]
+        return np.empty(0, dtype=np.int64)
 
-    if selected_state != "All":
-        filtered_df = filtered_df[filtered_df["State"] == selected_state]
-    if selected_city != "All":
-        filtered_df = filtered_df[filtered_df["City"] == selected_city] 
-    if selected_address != "All":
-        filtered_df = filtered_df[filtered_df["store_address"] == selected_address] 
+    # Date range and location resolved on the date-sorted index (binary search per store)
+    filtered_rows = time_index.select(start_date, end_date, selected_state, selected_city, selected_address)
 
     # Store filters in session
     current_filters = {
@@ -140,7 +226,7 @@ def apply_filters(df):
         st.session_state.positive_topic = "All"
         st.session_state.negative_topic = "All"
 
-    return filtered_df
+    return filtered_rows
 
 # ============================== UI HELPERS ==============================
 
@@ -168,106 +254,126 @@ def render_metric(label, value, bg_color, text_color):
         </div>
     """, unsafe_allow_html=True)
 
-# Prompt system
-sys_prompt = """
-You are a manager at McDonald's, responding to client reviews about the restaurant.
-You need to be extremely polite and speak correct English.
-Thank the client for their review.
-If the review mentions a bad experience, apologize for it and invite the client to come again.
-Limit your answer to two sentences.
-"""
-
-# LangChain pipeline
-template = ChatPromptTemplate.from_messages([
-    ("system", sys_prompt),
-    ("user", "{text}"),
-])
-
-# MISTRAL API KEY: real key is saved in the .env
-load_dotenv()
-mistral_api_key = os.getenv("MISTRAL_API_KEY")
-model = ChatMistralAI(model="mistral-small-latest",mistral_api_key=mistral_api_key)
-parser = StrOutputParser()
-chain = template | model | parser  # ✅ Cette variable "chain" est celle à passer à render_comments
-
-
-# Seuil pour filtrer les labels
-seuil = 0.2
-
-def render_comments(comments, color_primary, color_secondary, chain, sentiment=""):
-    """Render a list of comments in stylized boxes."""
-    for index, comment in comments.items():
-        if index not in filtered_df.index:
-            continue
-        # Récupérer les labels avec un score supérieur au seuil pour ce commentaire
-        labels_above_threshold = filtered_df[labels].loc[index] > seuil
-        selected_labels = filtered_df[labels].columns[labels_above_threshold].tolist()
-        labels_str = " ".join([f"#{label}" for label in selected_labels])
-        formatted_comment = comment.replace('\n', ' ')
-
-        # Générer une clé unique
-        hash_key = hashlib.md5(f"{index}-{comment}-{sentiment}".encode()).hexdigest()[:8]
-        unique_key = f"show_reply_{hash_key}"
+# Prompt system et chaîne LangChain (partagés avec pipeline.bulk_replies, voir dashboard/llm_provider.py)
+@st.cache_resource
+def load_llm_provider(backend: str):
+    """LLM client shared by all sessions; the chain is only built on the first "Generate an answer"."""
+    return LLMProvider(backend)
+
+
+# MISTRAL API KEY: real key is saved in the .env (backend: DASHBOARD_LLM_BACKEND=mistral|local|disabled)
+llm = load_llm_provider(configured_backend())  # ✅ Cette variable "llm" est celle à passer à render_comments
+sys_prompt = llm.sys_prompt
+model_name = llm.model_name
+
 
+@st.cache_resource
+def load_reply_cache():
+    """Reply cache shared by all sessions (SQLite, survives restarts)."""
+    return ReplyCache()
+
+
+def show_reply(placeholder, reply):
+    placeholder.markdown(f"<p style='color:gray; font-style:italic;'>🤖 {reply}</p>", unsafe_allow_html=True)
+
+
+def generate_reply(text, llm, placeholder):
+    """Reply to a review, streamed into ``placeholder`` token by token.
+
+    Served from the cache when this review, prompt and model were already
+    answered; a streamed reply is cached only once complete. Changing page
+    interrupts the run, which closes the stream and cancels the request.
+    """
+    reply_cache = load_reply_cache()
+    reply = reply_cache.get(text, sys_prompt, model_name)
+    if reply is None:
+        reply = ""
+        with closing(llm.stream(text, timeout=REPLY_TIMEOUT)) as chunks:
+            for chunk in chunks:
+                reply += chunk
+                show_reply(placeholder, reply + " ▌")
+        reply_cache.put(text, sys_prompt, model_name, reply)
+    show_reply(placeholder, reply)
+
+
+# Seuil pour filtrer les labels (un par label, voir dashboard/topics.json)
+seuil = topic_registry.thresholds(labels)
+
+def render_comments(comments, color_primary, color_secondary, llm):
+    """Render a page of comments (see ``page_payload``) in stylized boxes."""
+    # Réponses déjà générées (bouton ou `python -m pipeline.bulk_replies`), affichées directement
+    stored_replies = load_reply_cache().lookup(comments["text"], sys_prompt, model_name)
+    for unique_key, formatted_comment, labels_str in comments[["key", "text", "tags"]].itertuples(index=False):
         # Conteneur visuel du commentaire
         st.markdown(f"<div style='background-color:{color_primary}; padding:10px; border-radius:10px; margin-bottom:10px;'>", unsafe_allow_html=True)
         st.markdown(f"<div style='color:{color_primary};'>💬 {formatted_comment}</div>", unsafe_allow_html=True)
         st.markdown(f"<p style='color:{color_secondary}; font-weight: bold;'>{labels_str}</p>", unsafe_allow_html=True)
 
-        # Bouton qui déclenche la génération via LLM
-        if st.button("Generate an answer", key=unique_key):
-            with st.spinner("Loading answer..."):
-                generated_response = chain.invoke({"text": formatted_comment})
-
-            st.markdown(f"<p style='color:gray; font-style:italic;'>🤖 {generated_response}</p>", unsafe_allow_html=True)
+        # Réponse déjà en cache, sinon bouton qui déclenche la génération via LLM
+        if formatted_comment in stored_replies:
+            st.markdown(f"<p style='color:gray; font-style:italic;'>🤖 {stored_replies[formatted_comment]}</p>", unsafe_allow_html=True)
+        elif llm.enabled and st.button("Generate an answer", key=unique_key):
+            try:
+                generate_reply(formatted_comment, llm, st.empty())
+            except TimeoutError:
+                st.warning(f"No answer after {REPLY_TIMEOUT} seconds, please try again.")
 
         st.markdown("</div>", unsafe_allow_html=True)
+
+
+def comment_cursors(pane, listing):
+    """Page cursors of a comment pane, restarted when its listing (filters, topic) changes."""
+    state = st.session_state.get(f"{pane}_cursors")
+    if state is None or state["listing"] != listing:
+        state = {"listing": listing, "cursors": [0]}
+        st.session_state[f"{pane}_cursors"] = state
+    return state["cursors"]
 # ============================== MAIN APP ==============================
+if SHARED_PATH.exists():
+    data_source = SHARED_PATH
+elif STORE_PATH.exists():
+    data_source = STORE_PATH
+else:
+    data_source = DATA_PATH
+
 with st.spinner("Loading data..."):
-    df = load_data(DATA_PATH)
+    df = load_dataset(data_source)
 
 if df.empty:
     st.warning("No data available. Please check the source file.")
     st.stop()
 
-filtered_df = apply_filters(df)
-
-dashboard_tab, reviews_tab = st.tabs(["📊 Overview", "📈 Review Trends"])
-
-# ============================== NPS MAPPING HELPER ==============================
-
-def compute_nps_value(sentiment):
-    """
-    Convert sentiment to NPS value:
-    - 'positive' => +1 (Promoter)
-    - 'neutral'  =>  0 (Passive)
-    - 'negative' => -1 (Detractor)
-    """
-    return {'positive': 1, 'neutral': 0, 'negative': -1}.get(sentiment, 0)
+# Labels du registre pas encore scorés dans les données (voir pipeline.topic_scoring rescore)
+labels = topic_registry.available(df.columns)
+seuil = seuil[labels]
 
+filtered_rows = apply_filters(load_location_index(data_source), load_time_index(data_source))
 
-sentiment_mapping = {'positive': 1, 'neutral': 0, 'negative': -1}
-filtered_df["nps_value"] = filtered_df["pred_sentiment"].map(sentiment_mapping).fillna(0)
+dashboard_tab, reviews_tab = st.tabs(["📊 Overview", "📈 Review Trends"])
 
+# ============================== NPS CUBE ==============================
+# Promoters / Passives / Detractors par restaurant, sommés depuis le cube store × jour
+# ('positive' => Promoter, 'negative' => Detractor, everything else => Passive)
+current_filters = st.session_state["selected_filters"]
+store_counts = load_nps_cube(data_source).query(
+    current_filters["start_date"],
+    current_filters["end_date"],
+    current_filters["state"],
+    current_filters["city"],
+    current_filters["address"],
+)
 
 # Calcul des % par catégorie
-promoters_pct = (filtered_df["nps_value"] == 1).mean() * 100
-detractors_pct = (filtered_df["nps_value"] == -1).mean() * 100
-passives_pct = (filtered_df["nps_value"] == 0).mean() * 100
+total_reviews, shares = summarize(store_counts)
+promoters_pct = shares["promoters"]
+detractors_pct = shares["detractors"]
+passives_pct = shares["passives"]
 
 # NPS Global
 nps_score = promoters_pct - detractors_pct
 
-### MAP NPS SCORE pour les bubbles 
-df['nps_val_sentiment'] = df["pred_sentiment"].map(sentiment_mapping).fillna(0)
-df["review_count"] = df.groupby("store_address")["review"].transform("count")
-filtered_NPS_df = df[df["review_count"] > 100]
-
-
 # ============================== METRICS ====================================================
 with dashboard_tab:
-    total_reviews = len(filtered_df)
-
     # ============================== TITLE ==============================
     ### attention, si changements, ne pas oublier de changer également dans reviews_tab
     filters = st.session_state.get("selected_filters", {})
@@ -291,16 +397,7 @@ with dashboard_tab:
 
     # ============================== AFFICHAGE DU SCORE NPS GLOBAL ==============================
 
-    #====== Appliquer la fonction pour créer une colonne 'nps_value'==========
-    filtered_df["nps_value"] = filtered_df["pred_sentiment"].apply(compute_nps_value)
-
-    #========= Calculer les pourcentages ===============
-    promoters_pct = (filtered_df["nps_value"] == 1).mean() * 100
-    detractors_pct = (filtered_df["nps_value"] == -1).mean() * 100
-    passives_pct = (filtered_df["nps_value"] == 0).mean() * 100
-
     #========= Affichage des métriques ==================
-    total_reviews = len(filtered_df)
     nps_color = "#1aa442" if nps_score > 50 else "#b36500" if nps_score > 0 else "#aa0000"
     nps_text_color = "#ffffff"
 
@@ -334,8 +431,11 @@ with dashboard_tab:
         render_metric("😠 Detractors", f"{detractors_pct:.1f}%", "#aa0000", "#ffb6b6")
 
     st.divider()
+    instrumentation.record("app.first_paint", time.perf_counter() - run_started)
 
     # ====================== AFFICHAGE NPS SCORE AND LOCATION MAP AND WEEKLY TRENDS ==============================
+    # Plotly n'est importé qu'ici, après les métriques (budget d'import : python -m dashboard.import_profile)
+    import plotly.express as px
 
 
     # ============= MCdonalds US map ==============
@@ -356,61 +456,52 @@ with dashboard_tab:
         """)
 
         required_cols = {"latitude", "longitude", "City", "store_address", "pred_sentiment", "clean_reviews"}
-        if required_cols.issubset(filtered_df.columns):
-
-            # Prepare data: drop missing coordinates and compute NPS value
-            location_df = filtered_df.dropna(subset=["latitude", "longitude", "store_address"])
-            location_df["nps_value"] = location_df["pred_sentiment"].apply(compute_nps_value)
-
-            # Group by store location
-            map_data = location_df.groupby(["store_address","City","State","latitude", "longitude", ]).agg(
-                review_count=("clean_reviews", "count"),
-                nps_score=("nps_value", lambda x: (x == 1).mean() * 100 - (x == -1).mean() * 100)
-            ).reset_index()
+        if required_cols.issubset(df.columns):
 
-            # Filter stores with more than 100 reviews
-            map_data = map_data[map_data["review_count"] > 100]
+            # Stores with more than 100 reviews, their NPS and bubble size (from the cube)
+            map_data = load_map_layer(data_source, current_filters)
 
             if not map_data.empty:
-                # Scale bubble size
-                map_data["size_scaled"] = map_data["review_count"].apply(lambda x: min(x, 100))
-
-                # Define fixed color scale (same visual logic every time)
-                custom_nps_scale_map = [
-                    [0.0, "red"],
-                    [0.3, "red"],
-                    [0.5, "white"],
-                    [0.6, "green"],
-                    [1.0, "green"]
-                ]
-
-                fig_map = px.scatter_geo(
-                    map_data,
-                    hover_data={
-                        "nps_score": ':.1f',
-                        "review_count": True,
-                        "City": True,
-                        "State":True
-                    },
-                    lat="latitude",
-                    lon="longitude",
-                    size="size_scaled",
-                    color="nps_score",
-                    color_continuous_scale=custom_nps_scale_map,
-                    range_color=[-70,70],
-                    hover_name="store_address",
-                    size_max=15,
-                    scope="usa",
-                    template="plotly_dark"
-                )
+                def build_map():
+                    # Define fixed color scale (same visual logic every time)
+                    custom_nps_scale_map = [
+                        [0.0, "red"],
+                        [0.3, "red"],
+                        [0.5, "white"],
+                        [0.6, "green"],
+                        [1.0, "green"]
+                    ]
+
+                    fig_map = px.scatter_geo(
+                        map_data,
+                        hover_data={
+                            "nps_score": ':.1f',
+                            "review_count": True,
+                            "City": True,
+                            "State":True
+                        },
+                        lat="latitude",
+                        lon="longitude",
+                        size="size_scaled",
+                        color="nps_score",
+                        color_continuous_scale=custom_nps_scale_map,
+                        range_color=[-70,70],
+                        hover_name="store_address",
+                        size_max=15,
+                        scope="usa",
+                        template="plotly_dark"
+                    )
 
-                fig_map.update_layout(
-                    margin=dict(l=0, r=0, t=50, b=10),
-                    coloraxis_colorbar=dict(
-                        title="NPS Score"
+                    fig_map.update_layout(
+                        margin=dict(l=0, r=0, t=50, b=10),
+                        coloraxis_colorbar=dict(
+                            title="NPS Score"
+                        )
                     )
-                )
+                    return fig_map
 
+                # Figure reconstruite seulement quand les filtres changent (cache partagé, voir dashboard/figure_cache.py)
+                fig_map = load_figure_cache().figure("map", current_filters, build_map, str(data_source))
                 st.plotly_chart(fig_map, use_container_width=True, config={'displayModeBar': False})
 
                 #--------- Add a caption under the map--------------------
@@ -496,57 +587,55 @@ with dashboard_tab:
     end = filters.get("end_date")
 
 
-    if "store_address" in filtered_df.columns and not filtered_df["store_address"].isna().all():
+    if "store_address" in df.columns and store_counts["store_address"].notna().any():
         
-        # Group by restaurant and compute NPS score as the difference between the percentage of promoters and detractors
-        nps_by_restaurant = (
-            filtered_df.groupby("store_address")
-            .agg(
-                NPS=("nps_value", lambda x: (x == 1).mean() * 100 - (x == -1).mean() * 100),
-                review_count=("nps_value", "count"),
-                City=("City", "first"),
-                State=("State", "first")
+        def build_nps():
+            # NPS score per restaurant (difference between the percentage of promoters and detractors)
+            nps_by_restaurant = (
+                restaurant_table(store_counts)
+                .sort_values("NPS", ascending=True)  # Sort from highest to lowest NPS
             )
-            .reset_index()
-            .sort_values("NPS", ascending=True)  # Sort from highest to lowest NPS
-        )
 
-        # Cap review count for visualization
-        nps_by_restaurant = nps_by_restaurant[nps_by_restaurant["review_count"] > 100]
+            # Cap review count for visualization
+            nps_by_restaurant = nps_by_restaurant[nps_by_restaurant["review_count"] > 100]
         
-        # Sort after filtering
-        nps_by_restaurant = nps_by_restaurant.sort_values("NPS", ascending=False)
-
-        # Define custom color gradient (red to white to green)
-        custom_nps_scale_bar = [
-                [0.0, "red"], 
-                [0.3, "red"],    
-                [0.5, "white"],
-                [0.6, "green"],  
-                [1.0, "green"]  
-            ]
-
-        # BAR CHART restaurants par NPS Score
-        fig_nps = px.bar(
-            nps_by_restaurant,
-            x="store_address",
-            y="NPS",
-            orientation="v",
-            color="NPS",
-            range_color=[-60 , 60],
-            color_continuous_scale=custom_nps_scale_bar,
-            hover_data={
-                "NPS": ":.2f",
-                "review_count": True,
-                "City": True,
-                "State": True
-                        },
-            template="plotly_dark",
-            height=600
-        )
+            # Sort after filtering
+            nps_by_restaurant = nps_by_restaurant.sort_values("NPS", ascending=False)
+
+            # Define custom color gradient (red to white to green)
+            custom_nps_scale_bar = [
+                    [0.0, "red"], 
+                    [0.3, "red"],    
+                    [0.5, "white"],
+                    [0.6, "green"],  
+                    [1.0, "green"]  
+                ]
 
-        # Rotate x-axis labels to improve readability
-        fig_nps.update_layout(xaxis_title="Restaurants",yaxis_title="NPS Score", xaxis_tickangle=-45 ) 
+            # BAR CHART restaurants par NPS Score
+            fig_nps = px.bar(
+                nps_by_restaurant,
+                x="store_address",
+                y="NPS",
+                orientation="v",
+                color="NPS",
+                range_color=[-60 , 60],
+                color_continuous_scale=custom_nps_scale_bar,
+                hover_data={
+                    "NPS": ":.2f",
+                    "review_count": True,
+                    "City": True,
+                    "State": True
+                            },
+                template="plotly_dark",
+                height=600
+            )
+
+            # Rotate x-axis labels to improve readability
+            fig_nps.update_layout(xaxis_title="Restaurants",yaxis_title="NPS Score", xaxis_tickangle=-45 ) 
+            return fig_nps
+
+        # Figure reconstruite seulement quand les filtres changent (cache partagé, voir dashboard/figure_cache.py)
+        fig_nps = load_figure_cache().figure("nps_by_restaurant", current_filters, build_nps, str(data_source))
         st.plotly_chart(fig_nps, use_container_width=True )
 
         # Build dynamic title based on the "address" filter:
@@ -590,6 +679,8 @@ with reviews_tab:
     st.markdown(filtered_title)
 
     # ============================== TOPICS BAR ==============================
+    import plotly.graph_objects as go
+
     with st.expander("ℹ️ What is Topic ratio ?", expanded=False):
         st.markdown("""
             **The Topic Ratio** measures the significance of a topic's frequency in positive or negative reviews relative to its overall frequency.
@@ -603,30 +694,14 @@ with reviews_tab:
         
     topics_col1, topics_col2 = st.columns(2)
 
-    # ==== Initialisation of the topic dataset
-    positive_df = filtered_df[filtered_df['pred_sentiment'] == 'positive']
-    top_topics_pos = (positive_df[labels] > seuil).sum()
-    df_pos = top_topics_pos.reset_index()
-    df_pos.columns = ['labels', 'count_positif']
-
-    negative_df = filtered_df[filtered_df['pred_sentiment'] == 'negative']
-    top_topics_neg = (negative_df[labels] > seuil).sum()
-    df_neg = top_topics_neg.reset_index()
-    df_neg.columns = ['labels', 'count_negatif']
-    
-    topic_df = pd.merge(df_pos, df_neg, on='labels', how='outer')
+    # ==== Initialisation of the topic dataset (calculé une fois par état des filtres)
+    topic_df = load_topic_ratios(data_source, current_filters, tuple(labels), tuple(seuil))
 
-    # Initialiser les colonnes 'frec_positif_vs_posneg' 'frec_negatif_vs_posneg' 'frec_positif_vs_totpos' 'frec_negatif_vs_totneg'
-    topic_df["frec_positif_vs_posneg"] = None
-    topic_df["frec_negatif_vs_posneg"] = None
-    topic_df["frec_positif_vs_totpos"] = None
-    topic_df["frec_negatif_vs_totneg"] = None
-
-    for i in topic_df.index:
-        topic_df.loc[i, "frec_positif_vs_posneg"] = (topic_df.loc[i, "count_positif"]) / (topic_df.loc[i, "count_positif"] + topic_df.loc[i, "count_negatif"])
-        topic_df.loc[i, "frec_negatif_vs_posneg"] = (topic_df.loc[i, "count_negatif"]) / (topic_df.loc[i, "count_positif"] + topic_df.loc[i, "count_negatif"])
-        topic_df.loc[i, "frec_positif_vs_totpos"] = ((topic_df.loc[i, "count_positif"]) / (topic_df["count_positif"].sum()))*100
-        topic_df.loc[i, "frec_negatif_vs_totneg"] = ((topic_df.loc[i, "count_negatif"]) / (topic_df["count_negatif"].sum()))*100
+    # Bitmaps topic × sentiment et ordre par score pré-calculé pour les commentaires
+    topic_index = load_topic_index(data_source, tuple(labels), tuple(seuil))
+    filtered_bits = filter_bits(data_source, current_filters, topic_index)
+    comment_index = load_comment_index(data_source)
+    selected_store = None if current_filters["address"] == "All" else current_filters["address"]
 
     with topics_col1:
         st.markdown("""
@@ -637,28 +712,33 @@ with reviews_tab:
     """, unsafe_allow_html=True)
 
                     
-        top_topics = topic_df[topic_df["frec_positif_vs_totpos"]>5][["labels", "frec_positif_vs_posneg"]].sort_values(by="frec_positif_vs_posneg", ascending=False)
-        topic_to_show = top_topics[top_topics["frec_positif_vs_posneg"]>0.51]
-        fig_topics = go.Figure()
-
-        fig_topics.add_trace(go.Bar(
-            x=topic_to_show["frec_positif_vs_posneg"],
-            y=topic_to_show["labels"],
-            orientation='h',
-            marker=dict(color='green'),
-            texttemplate='%{x:.2f}',  # Formater le texte pour afficher deux décimales
-            textposition='auto',
-            hovertemplate='%{y}: %{x} mentions<extra></extra>',
-        ))
-
-        fig_topics.update_layout(
-            xaxis_title="Topic ratio",
-            height=500,
-            template="plotly_dark",
-            margin=dict(l=20, r=20, t=50, b=20),
-        )
-
-        fig_topics.update_yaxes(autorange="reversed")  # Most frequent on top
+        def build_positive_topics():
+            top_topics = topic_df[topic_df["frec_positif_vs_totpos"]>5][["labels", "frec_positif_vs_posneg"]].sort_values(by="frec_positif_vs_posneg", ascending=False)
+            topic_to_show = top_topics[top_topics["frec_positif_vs_posneg"]>0.51]
+            fig_topics = go.Figure()
+
+            fig_topics.add_trace(go.Bar(
+                x=topic_to_show["frec_positif_vs_posneg"],
+                y=topic_to_show["labels"],
+                orientation='h',
+                marker=dict(color='green'),
+                texttemplate='%{x:.2f}',  # Formater le texte pour afficher deux décimales
+                textposition='auto',
+                hovertemplate='%{y}: %{x} mentions<extra></extra>',
+            ))
+
+            fig_topics.update_layout(
+                xaxis_title="Topic ratio",
+                height=500,
+                template="plotly_dark",
+                margin=dict(l=20, r=20, t=50, b=20),
+            )
+
+            fig_topics.update_yaxes(autorange="reversed")  # Most frequent on top
+            return fig_topics
+
+        # Figure reconstruite seulement quand les filtres changent (cache partagé, voir dashboard/figure_cache.py)
+        fig_topics = load_figure_cache().figure("positive_topics", current_filters, build_positive_topics, str(data_source), labels, list(seuil))
         st.plotly_chart(fig_topics, use_container_width=True)
 
 
@@ -669,28 +749,32 @@ with reviews_tab:
         <i><h7>Topics with at least 5% occurrences among negative reviews and ratio above 0.50</h7></i>
     </div>
     """, unsafe_allow_html=True)
-        top_topics = topic_df[topic_df["frec_negatif_vs_totneg"]>5][["labels", "frec_negatif_vs_posneg"]].sort_values(by="frec_negatif_vs_posneg", ascending=False)
-        topic_to_show = top_topics[top_topics["frec_negatif_vs_posneg"]>0.51]
-        fig_topics = go.Figure()
-
-        fig_topics.add_trace(go.Bar(
-            x=topic_to_show["frec_negatif_vs_posneg"],
-            y=topic_to_show["labels"],
-            orientation='h',
-            marker=dict(color='red'),
-            texttemplate='%{x:.2f}',  # Formater le texte pour afficher deux décimales
-            textposition='auto',
-            hovertemplate='%{y}: %{x} mentions<extra></extra>',
-        ))
-
-        fig_topics.update_layout(
-            xaxis_title="Topic ratio",
-            height=500,
-            template="plotly_dark",
-            margin=dict(l=20, r=20, t=50, b=20),
-        )
-
-        fig_topics.update_yaxes(autorange="reversed")  # Most frequent on top
+        def build_negative_topics():
+            top_topics = topic_df[topic_df["frec_negatif_vs_totneg"]>5][["labels", "frec_negatif_vs_posneg"]].sort_values(by="frec_negatif_vs_posneg", ascending=False)
+            topic_to_show = top_topics[top_topics["frec_negatif_vs_posneg"]>0.51]
+            fig_topics = go.Figure()
+
+            fig_topics.add_trace(go.Bar(
+                x=topic_to_show["frec_negatif_vs_posneg"],
+                y=topic_to_show["labels"],
+                orientation='h',
+                marker=dict(color='red'),
+                texttemplate='%{x:.2f}',  # Formater le texte pour afficher deux décimales
+                textposition='auto',
+                hovertemplate='%{y}: %{x} mentions<extra></extra>',
+            ))
+
+            fig_topics.update_layout(
+                xaxis_title="Topic ratio",
+                height=500,
+                template="plotly_dark",
+                margin=dict(l=20, r=20, t=50, b=20),
+            )
+
+            fig_topics.update_yaxes(autorange="reversed")  # Most frequent on top
+            return fig_topics
+
+        fig_topics = load_figure_cache().figure("negative_topics", current_filters, build_negative_topics, str(data_source), labels, list(seuil))
         st.plotly_chart(fig_topics, use_container_width=True)
     
     # ============================== TOP COMMENTS ==============================
@@ -720,15 +804,13 @@ with reviews_tab:
         # Ajouter un menu déroulant pour sélectionner un sujet
         selected_top_topic = st.selectbox("Select a topic to filter the good comments", options=["All"] + labels, key="positive_topic")
 
-        # Filtrer le DataFrame en fonction du sujet sélectionné
-        if selected_top_topic != "All":
-            topic_filtered_df = filtered_df[filtered_df[selected_top_topic] > seuil]
-        else:
-            topic_filtered_df = filtered_df
-
-        top_pos_df = topic_filtered_df[topic_filtered_df["pred_sentiment"] == "positive"].sort_values(by='RoBERTa_score', ascending=False)
-        top_pos = top_pos_df["review"].iloc[st.session_state.positive_start_index:st.session_state.positive_start_index+5]
-        render_comments(top_pos, style["bg"], style["text"], chain, sentiment="positive")
+        # Promoteurs du sujet sélectionné (filtres ∩ sentiment ∩ sujet), page lue dans l'ordre pré-trié
+        topic = None if selected_top_topic == "All" else selected_top_topic
+        top_pos_bits = topic_index.bits(filtered_bits, PROMOTER, topic)
+        cursors = comment_cursors("positive", (topic, current_filters))
+        top_pos_positions = comment_index.page(top_pos_bits, PROMOTER, cursors, st.session_state.positive_page, 5, selected_store)
+        top_pos = page_payload(df, top_pos_positions, labels, seuil, sentiment="positive")
+        render_comments(top_pos, style["bg"], style["text"], llm)
 
         # Afficher le numéro de la page
         st.write(f"Page {st.session_state.positive_page}")
@@ -742,7 +824,7 @@ with reviews_tab:
                     st.session_state.positive_page -= 1
                     st.rerun()
         with col2:
-            if st.session_state.positive_start_index + 5 < len(top_pos_df):
+            if st.session_state.positive_start_index + 5 < topic_index.count(top_pos_bits):
                 if st.button("Next", key="positive_next_button"):
                     st.session_state.positive_start_index += 5
                     st.session_state.positive_page += 1
@@ -755,15 +837,13 @@ with reviews_tab:
         # Ajouter un menu déroulant pour sélectionner un sujet
         selected_bad_topic = st.selectbox("Select a topic to filter the bad comments", options=["All"] + labels, key="negative_topic")
 
-        # Filtrer le DataFrame en fonction du sujet sélectionné
-        if selected_bad_topic != "All":
-            topic_filtered_df = filtered_df[filtered_df[selected_bad_topic] > seuil]
-        else:
-            topic_filtered_df = filtered_df
-
-        top_neg_df = topic_filtered_df[topic_filtered_df["pred_sentiment"] == "negative"].sort_values(by='RoBERTa_score', ascending=False)
-        top_neg = top_neg_df["review"].iloc[st.session_state.negative_start_index:st.session_state.negative_start_index+5]
-        render_comments(top_neg, style["bg"], style["text"], chain, sentiment="negative")
+        # Détracteurs du sujet sélectionné (filtres ∩ sentiment ∩ sujet), page lue dans l'ordre pré-trié
+        topic = None if selected_bad_topic == "All" else selected_bad_topic
+        top_neg_bits = topic_index.bits(filtered_bits, DETRACTOR, topic)
+        cursors = comment_cursors("negative", (topic, current_filters))
+        top_neg_positions = comment_index.page(top_neg_bits, DETRACTOR, cursors, st.session_state.negative_page, 5, selected_store)
+        top_neg = page_payload(df, top_neg_positions, labels, seuil, sentiment="negative")
+        render_comments(top_neg, style["bg"], style["text"], llm)
 
         # Afficher le numéro de la page
         st.write(f"Page {st.session_state.negative_page}")
@@ -777,11 +857,11 @@ with reviews_tab:
                     st.session_state.negative_page -= 1
                     st.rerun()
         with col2:
-            if st.session_state.negative_start_index + 5 < len(top_neg_df):
+            if st.session_state.negative_start_index + 5 < topic_index.count(top_neg_bits):
                 if st.button("Next", key="negative_next_button"):
                     st.session_state.negative_start_index += 5
                     st.session_state.negative_page += 1
                     st.rerun()
 # ============================== EMPTY STATE ==============================
-if filtered_df.empty:
+if len(filtered_rows) == 0:
     st.warning("No reviews match the selected filters. Try adjusting them.")
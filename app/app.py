@@ -2,18 +2,10 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 from datetime import datetime
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_mistralai import ChatMistralAI
 import hashlib
 import os
-from dotenv import load_dotenv
 
 # ============================== CONFIG ===================================
 DATA_PATH = Path("data\data_avec_labels.csv")
@@ -177,24 +169,31 @@ If the review mentions a bad experience, apologize for it and invite the client
 Limit your answer to two sentences.
 """
 
-# LangChain pipeline
-template = ChatPromptTemplate.from_messages([
-    ("system", sys_prompt),
-    ("user", "{text}"),
-])
+# LangChain pipeline, construit (et importé) au premier clic seulement
+@st.cache_resource
+def load_chain():
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_mistralai import ChatMistralAI
+    from dotenv import load_dotenv
 
-# MISTRAL API KEY: real key is saved in the .env
-load_dotenv()
-mistral_api_key = os.getenv("MISTRAL_API_KEY")
-model = ChatMistralAI(model="mistral-small-latest",mistral_api_key=mistral_api_key)
-parser = StrOutputParser()
-chain = template | model | parser  # ✅ Cette variable "chain" est celle à passer à render_comments
+    template = ChatPromptTemplate.from_messages([
+        ("system", sys_prompt),
+        ("user", "{text}"),
+    ])
+
+    # MISTRAL API KEY: real key is saved in the .env
+    load_dotenv()
+    mistral_api_key = os.getenv("MISTRAL_API_KEY")
+    model = ChatMistralAI(model="mistral-small-latest",mistral_api_key=mistral_api_key)
+    parser = StrOutputParser()
+    return template | model | parser
 
 
 # Seuil pour filtrer les labels
 seuil = 0.2
 
-def render_comments(comments, color_primary, color_secondary, chain, sentiment=""):
+def render_comments(comments, color_primary, color_secondary, sentiment=""):
     """Render a list of comments in stylized boxes."""
     for index, comment in comments.items():
         if index not in filtered_df.index:
@@ -217,7 +216,7 @@ def render_comments(comments, color_primary, color_secondary, chain, sentiment="
         # Bouton qui déclenche la génération via LLM
         if st.button("Generate an answer", key=unique_key):
             with st.spinner("Loading answer..."):
-                generated_response = chain.invoke({"text": formatted_comment})
+                generated_response = load_chain().invoke({"text": formatted_comment})
 
             st.markdown(f"<p style='color:gray; font-style:italic;'>🤖 {generated_response}</p>", unsafe_allow_html=True)
 
@@ -334,6 +333,8 @@ with dashboard_tab:
         render_metric("😠 Detractors", f"{detractors_pct:.1f}%", "#aa0000", "#ffb6b6")
 
     st.divider()
+    import plotly.express as px
+    import plotly.graph_objects as go
 
     # ====================== AFFICHAGE NPS SCORE AND LOCATION MAP AND WEEKLY TRENDS ==============================
 
@@ -728,7 +729,7 @@ with reviews_tab:
 
         top_pos_df = topic_filtered_df[topic_filtered_df["pred_sentiment"] == "positive"].sort_values(by='RoBERTa_score', ascending=False)
         top_pos = top_pos_df["review"].iloc[st.session_state.positive_start_index:st.session_state.positive_start_index+5]
-        render_comments(top_pos, style["bg"], style["text"], chain, sentiment="positive")
+        render_comments(top_pos, style["bg"], style["text"], sentiment="positive")
 
         # Afficher le numéro de la page
         st.write(f"Page {st.session_state.positive_page}")
@@ -763,7 +764,7 @@ with reviews_tab:
 
         top_neg_df = topic_filtered_df[topic_filtered_df["pred_sentiment"] == "negative"].sort_values(by='RoBERTa_score', ascending=False)
         top_neg = top_neg_df["review"].iloc[st.session_state.negative_start_index:st.session_state.negative_start_index+5]
-        render_comments(top_neg, style["bg"], style["text"], chain, sentiment="negative")
+        render_comments(top_neg, style["bg"], style["text"], sentiment="negative")
 
         # Afficher le numéro de la page
         st.write(f"Page {st.session_state.negative_page}")
@@ -2,10 +2,6 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 
 # ============================== CONFIG ==============================
@@ -141,10 +137,6 @@ def render_metric(label, value, bg_color, text_color):
         </div>
     """, unsafe_allow_html=True)
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_mistralai import ChatMistralAI
-
 # Prompt system
 sys_prompt = """
 You are a manager of McDonald's giving answers to clients' reviews about the restaurant.
@@ -153,20 +145,26 @@ If the review talks about a bad experience, apologize for it and invite the clie
 Limit your answer to 2 sentences.
 """
 
-# LangChain pipeline
-template = ChatPromptTemplate.from_messages([
-    ("system", sys_prompt),
-    ("user", "{text}"),
-])
-model = ChatMistralAI(model="mistral-small-latest")
-parser = StrOutputParser()
-chain = template | model | parser  # ✅ Cette variable "chain" est celle à passer à render_comments
+# LangChain pipeline, construit (et importé) au premier clic seulement
+@st.cache_resource
+def load_chain():
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_mistralai import ChatMistralAI
+
+    template = ChatPromptTemplate.from_messages([
+        ("system", sys_prompt),
+        ("user", "{text}"),
+    ])
+    model = ChatMistralAI(model="mistral-small-latest")
+    parser = StrOutputParser()
+    return template | model | parser
 
 # Seuil pour filtrer les labels
 import hashlib
 seuil = 0.2
 
-def render_comments(comments, color_primary, color_secondary, chain, sentiment=""):
+def render_comments(comments, color_primary, color_secondary, sentiment=""):
     for index, comment in comments.items():
         if index not in filtered_df.index:
             continue
@@ -188,7 +186,7 @@ def render_comments(comments, color_primary, color_secondary, chain, sentiment="
         # Bouton qui déclenche la génération via LLM
         if st.button("Voir réponse", key=unique_key):
             with st.spinner("Génération de la réponse..."):
-                generated_response = chain.invoke({"text": formatted_comment})
+                generated_response = load_chain().invoke({"text": formatted_comment})
 
             st.markdown(f"<p style='color:gray; font-style:italic;'>🤖 {generated_response}</p>", unsafe_allow_html=True)
 
@@ -293,6 +291,8 @@ with dashboard_tab:
     st.markdown("</div>", unsafe_allow_html=True)
 
     st.divider()
+    import plotly.express as px
+    import plotly.graph_objects as go
 
 # ============================== LOCATION MAP AND WEEKLY TRENDS ==============================
 
@@ -526,7 +526,7 @@ with dashboard_tab:
 
         top_pos_df = topic_filtered_df[topic_filtered_df["pred_sentiment"] == "positive"].sort_values(by='RoBERTa_score', ascending=False)
         top_pos = top_pos_df["review"].iloc[st.session_state.positive_start_index:st.session_state.positive_start_index+5]
-        render_comments(top_pos, style["bg"], style["text"], chain, sentiment="positive")
+        render_comments(top_pos, style["bg"], style["text"], sentiment="positive")
 
         # Afficher le numéro de la page
         st.write(f"Page {st.session_state.positive_page}")
@@ -561,7 +561,7 @@ with dashboard_tab:
 
         top_neg_df = topic_filtered_df[topic_filtered_df["pred_sentiment"] == "negative"].sort_values(by='RoBERTa_score', ascending=False)
         top_neg = top_neg_df["review"].iloc[st.session_state.negative_start_index:st.session_state.negative_start_index+5]
-        render_comments(top_neg, style["bg"], style["text"], chain, sentiment="negative")
+        render_comments(top_neg, style["bg"], style["text"], sentiment="negative")
 
         # Afficher le numéro de la page
         st.write(f"Page {st.session_state.negative_page}")
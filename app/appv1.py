@@ -3,10 +3,7 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 
 # ============================== CONFIG ==============================
@@ -243,6 +240,7 @@ with dashboard_tab:
     st.markdown("</div>", unsafe_allow_html=True)
 
     st.divider()
+    import plotly.express as px
 
 
 
@@ -367,6 +365,10 @@ with dashboard_tab:
         positive_df = filtered_df[filtered_df['pred_sentiment'] == 'positive']
         top_topics = (positive_df[labels] > seuil).sum().sort_values(ascending=False).head(10)        
 
+        # matplotlib/seaborn ne sont importés que pour ce graphique
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plt.figure(figsize=(10, 15))
         sns.barplot(x=top_topics.values, y=top_topics.index, palette=["green"])
 
@@ -2,10 +2,6 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 
 # ============================== CONFIG ==============================
@@ -253,6 +249,8 @@ with dashboard_tab:
     st.markdown("</div>", unsafe_allow_html=True)
 
     st.divider()
+    import plotly.express as px
+    import plotly.graph_objects as go
 
 
 # ============================== LOCATION MAP AND WEEKLY TRENDS ==============================
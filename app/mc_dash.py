@@ -1,8 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from textblob import TextBlob
-from streamlit_extras.switch_page_button import switch_page
 
 
 # Titre du dashboard
@@ -24,6 +22,8 @@ if st.checkbox('Afficher les données brutes'):
 
 
 def analyze_sentiment(df):
+    from textblob import TextBlob  # import lourd, seulement si l'analyse est lancée
+
     # Appliquer l'analyse de sentiment
     df['sentiment'] = df['review'].apply(lambda x: TextBlob(str(x)).sentiment.polarity)
     return df
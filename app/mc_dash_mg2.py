@@ -1,12 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import folium
-from streamlit_folium import folium_static
-import pydeck as pdk
-import branca.colormap as cm
-from branca.element import Template, MacroElement
 
 # Titre du dashboard
 st.title("Client's reviews dashboard")
@@ -138,6 +132,11 @@ if selected_address == "All":
         filtered_df['RoBerta_score'] = pd.to_numeric(filtered_df['RoBerta_score'], errors='coerce')
         filtered_df_grouped = filtered_df.groupby(['latitude', 'longitude', 'store_address']).agg({'RoBerta_score': 'mean'}).reset_index()
 
+        # Imports lourds, seulement quand la carte est affichée
+        import branca.colormap as cm
+        import folium
+        from streamlit_folium import folium_static
+
         # Créer une carte centrée sur les États-Unis
         m = folium.Map(location=[37.0902, -95.7129], zoom_start=4, tiles="cartodb Dark Matter")
 
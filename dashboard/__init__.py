@@ -0,0 +1 @@
+"""Data structures and helpers backing the Streamlit dashboard (app.py)."""
@@ -0,0 +1,121 @@
+"""Pre-sorted comment order for the paginated comment panes.
+
+Every Next/Previous click used to filter the reviews by sentiment and re-sort
+the whole filtered frame by ``RoBERTa_score`` before slicing five rows. Here
+the row positions of each sentiment code (and of each store within it) are
+sorted by score once, at load time. A page is read by walking that order from
+a cursor and keeping the rows set in the bitmap of the current filters and
+topic (``dashboard.topic_index``): the cost is proportional to the rows
+walked, not to the filtered frame, and the cursor of each page is kept so
+deep pages cost the same as page 1.
+
+``page_payload`` then prepares what the renderer needs for the rows of one
+page only (text, topic hashtags and widget key), so rendering a page does not
+touch the filtered dataset either.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from dashboard.nps import CODE_COLUMN, DETRACTOR, PASSIVE, PROMOTER
+from dashboard.topic_stats import topic_hits
+
+SCORE_COLUMN = "RoBERTa_score"
+
+# First number of rows tested per step when walking an order (doubled at each step)
+_FIRST_STEP = 256
+
+
+def _is_set(bits, positions):
+    """Bits of ``positions`` in a uint64 bitmap."""
+    words = bits[positions >> 6]
+    return (words >> (positions & 63).astype(np.uint64)) & np.uint64(1) == 1
+
+
+class CommentIndex:
+    """Row positions sorted by descending score, per sentiment code and per (code, store)."""
+
+    def __init__(self, df, score_column=SCORE_COLUMN):
+        positions = np.arange(len(df))
+        scores = df[score_column].to_numpy(dtype=np.float64)
+        codes = df[CODE_COLUMN].to_numpy()
+        # descending score, missing scores last, ties in row order
+        order = np.lexsort((positions, -scores))
+
+        self.orders = {}
+        for code in (PROMOTER, PASSIVE, DETRACTOR):
+            self.orders[code] = order[codes[order] == code]
+        if "store_address" in df.columns:
+            store_ids, addresses = pd.factorize(df["store_address"].astype(object))
+            for code in (PROMOTER, PASSIVE, DETRACTOR):
+                by_code = self.orders[code]
+                ids = store_ids[by_code]
+                # stable sort keeps the score order within each store
+                grouped = by_code[np.argsort(ids, kind="stable")]
+                bounds = np.searchsorted(np.sort(ids), np.arange(len(addresses) + 1))
+                for i, address in enumerate(addresses):
+                    self.orders[code, address] = grouped[bounds[i]:bounds[i + 1]]
+
+    def order(self, code, address=None):
+        """Sorted positions of a sentiment code, restricted to one store when given."""
+        if address is None:
+            return self.orders[code]
+        return self.orders.get((code, address), np.empty(0, dtype=np.int64))
+
+    def seek(self, bits, code, cursor, count, address=None):
+        """Up to ``count`` positions set in ``bits``, walking the order from ``cursor``.
+
+        Returns (positions, next cursor).
+        """
+        order = self.order(code, address)
+        found = []
+        step = _FIRST_STEP
+        while cursor < len(order) and count > 0:
+            chunk = order[cursor:cursor + step]
+            hits = np.flatnonzero(_is_set(bits, chunk))[:count]
+            found.append(chunk[hits])
+            count -= len(hits)
+            cursor = cursor + hits[-1] + 1 if count == 0 else cursor + len(chunk)
+            step *= 2
+        positions = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        return positions, cursor
+
+    def page(self, bits, code, cursors, page, size, address=None):
+        """Positions of page ``page`` (1-based) of ``size`` rows.
+
+        ``cursors`` holds the cursor of each page start already visited
+        (``[0]`` for a new listing) and is extended in place.
+        """
+        while len(cursors) < page:
+            _, cursor = self.seek(bits, code, cursors[-1], size, address)
+            cursors.append(cursor)
+        positions, cursor = self.seek(bits, code, cursors[page - 1], size, address)
+        if len(cursors) == page:
+            cursors.append(cursor)
+        return positions
+
+
+
+def page_payload(df, positions, labels, thresholds, sentiment=""):
+    """Comments of one page: ``key`` (stable widget key), ``text`` and ``tags`` (topic hashtags).
+
+    Indexed like ``df``; only the page rows are read.
+    """
+    rows = df.take(positions)
+    comments = rows["review"]
+    hashtags = np.array([f"#{label}" for label in labels], dtype=object)
+    hits = topic_hits(rows, labels, thresholds)
+    keys = [
+        "show_reply_" + hashlib.md5(f"{index}-{comment}-{sentiment}".encode()).hexdigest()[:8]
+        for index, comment in comments.items()
+    ]
+    return pd.DataFrame(
+        {
+            "key": keys,
+            "text": comments.str.replace("\n", " ", regex=False),
+            "tags": [" ".join(hashtags[row]) for row in hits],
+        },
+        index=comments.index,
+    )
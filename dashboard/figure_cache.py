@@ -0,0 +1,80 @@
+"""LRU cache of the dashboard's Plotly figures, keyed by filter state.
+
+Every rerun used to rebuild the map, the NPS bar chart and the two topic
+charts, even when only the comment pagination changed or the user switched
+tabs. Building a figure with Plotly Express and validating it costs tens of
+milliseconds; reloading its serialized spec without validation costs a few.
+Figures are now stored as their JSON spec under a canonical hash of the
+sidebar filters (``st.session_state["selected_filters"]``), the chart type and
+whatever else the chart depends on (data source, labels, ...). The cache is
+shared by all sessions, evicts the least recently used specs above
+``max_entries`` and counts hits and misses; build times are recorded in
+``dashboard.instrumentation`` under ``figure.<chart>``.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from dashboard import instrumentation
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+def figure_key(chart, filters, *context):
+    """Canonical hash of a chart type, a filter state and extra context (order of the filters is irrelevant)."""
+    payload = json.dumps([chart, filters, context], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class FigureCache:
+    """Serialized Plotly figures with LRU eviction and hit-rate counters (thread-safe)."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.specs = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def spec(self, chart, filters, build, *context):
+        """JSON spec of the chart for the filters, ``build()`` (returning a figure) on a miss."""
+        key = figure_key(chart, filters, *context)
+        with self.lock:
+            spec = self.specs.get(key)
+            if spec is not None:
+                self.specs.move_to_end(key)
+                self.hits += 1
+                return spec
+            self.misses += 1
+        with instrumentation.timed(f"figure.{chart}"):
+            spec = build().to_json()
+        with self.lock:
+            self.specs[key] = spec
+            self.specs.move_to_end(key)
+            while len(self.specs) > self.max_entries:
+                self.specs.popitem(last=False)
+                self.evictions += 1
+        return spec
+
+    def figure(self, chart, filters, build, *context):
+        """The cached chart as a figure (not validated again: the spec came from a built figure)."""
+        import plotly.graph_objects as go
+
+        return go.Figure(json.loads(self.spec(chart, filters, build, *context)), _validate=False)
+
+    def stats(self):
+        """Entries, hits, misses, evictions and hit rate."""
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self.specs),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+    def clear(self):
+        with self.lock:
+            self.specs.clear()
@@ -0,0 +1,166 @@
+"""Import-time profile and cold-start budget of the dashboard scripts.
+
+Every Streamlit script pays for its top-level imports before anything is
+drawn, and the first session of a process pays for them cold. The dashboards
+used to import matplotlib, seaborn, Plotly and LangChain (and folium,
+textblob, ...) at the top even when unused; heavy libraries are now imported
+in the section that renders with them. This module keeps it that way:
+
+- the eager imports of a script are the ``import`` statements every run
+  executes: at module level and inside top-level ``with``/``if``/``try``
+  blocks (the tabs and sections of a Streamlit script); only imports in
+  function bodies are deferred;
+- they are run in a fresh interpreter with ``python -X importtime`` and the
+  cost of each top-level module is reported, with its cumulative time;
+- ``--budget`` fails (exit code 1) when the cold import time of a script is
+  above a number of seconds, ``--relative`` when it is above a multiple of
+  the cost of ``import pandas, streamlit`` (the floor of every dashboard),
+  measured first in the same interpreter, so a new eager import of a heavy
+  library is caught on slow and fast machines alike.
+  ``tests/test_import_budget.py`` runs it on ``app.py`` and ``app/*.py``.
+
+Imports that fail (library not installed) are reported, not counted.
+
+Usage::
+
+    python -m dashboard.import_profile app.py
+    python -m dashboard.import_profile app.py app/*.py --top 10 --budget 2.0
+    python -m dashboard.import_profile app.py app/*.py --relative 1.4
+"""
+
+import argparse
+import ast
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+DEFAULT_SCRIPT = Path("app.py")
+
+# Cold import budget of the eager imports of one script (seconds)
+IMPORT_BUDGET = 2.0
+# ... or as a multiple of the imports every dashboard needs
+BASELINE_IMPORTS = ["import pandas", "import streamlit"]
+IMPORT_BUDGET_RATIO = 1.4
+
+# import time: self [us] | cumulative | imported package
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+# written on stderr by the probe before the baseline and before the statements
+_BASELINE_MARKER = "-- import profile: baseline --"
+_MARKER = "-- import profile --"
+
+
+def _run_imports(body):
+    """Import statements run with ``body``: nested blocks included, function and class bodies excluded."""
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield ast.unparse(node)
+        elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            for field in ("body", "orelse", "finalbody", "handlers", "cases"):
+                yield from _run_imports(getattr(node, field, []))
+
+
+def eager_imports(path):
+    """Import statements run by every run of a script (source lines, in order)."""
+    return list(_run_imports(ast.parse(Path(path).read_text(encoding="utf-8")).body))
+
+
+def _probe(statements, baseline=()):
+    """Code running ``baseline`` then ``statements`` one by one, printing the statements that fail on stdout."""
+    lines = ["import sys", f"sys.stderr.write({_BASELINE_MARKER!r} + '\\n')", *baseline,
+             f"sys.stderr.write({_MARKER!r} + '\\n')"]
+    for statement in statements:
+        lines += [
+            "try:",
+            f"    {statement}",
+            "except Exception as e:",
+            f"    print({statement!r} + ': ' + type(e).__name__)",
+        ]
+    return "\n".join(lines)
+
+
+def _top_level(lines):
+    """(name, self seconds, cumulative seconds) of the modules imported by the probe itself."""
+    modules = []
+    for line in lines:
+        match = _IMPORTTIME.match(line)
+        # one space of indentation: imported by the probe, not by another module
+        if match and len(match.group(3)) == 1:
+            modules.append((match.group(4), int(match.group(1)) / 1e6, int(match.group(2)) / 1e6))
+    return modules
+
+
+def profile_imports(statements, baseline=(), cwd=None):
+    """Run ``baseline`` then ``statements`` in a fresh interpreter with ``-X importtime``.
+
+    Returns (modules, failed, baseline seconds): ``modules`` lists (name,
+    self seconds, cumulative seconds) of the modules imported by the
+    statements directly (not already imported by the baseline), and
+    ``failed`` the statements that raised.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _probe(statements, baseline)],
+        capture_output=True, text=True, cwd=cwd,
+    )
+    _, profiled = result.stderr.split(_BASELINE_MARKER, 1)
+    baseline_lines, statement_lines = profiled.split(_MARKER, 1)
+    baseline_seconds = sum(cumulative for _, _, cumulative in _top_level(baseline_lines.splitlines()))
+    return _top_level(statement_lines.splitlines()), result.stdout.splitlines(), baseline_seconds
+
+
+def fastest_profile(statements, baseline=(), repeat=3, cwd=None):
+    """(total seconds, modules, failed, baseline seconds) of the fastest of ``repeat`` runs.
+
+    The total includes the baseline. The fastest run is the least disturbed
+    by the other processes of the machine.
+    """
+    runs = []
+    for _ in range(repeat):
+        modules, failed, baseline_seconds = profile_imports(statements, baseline, cwd)
+        total = baseline_seconds + sum(cumulative for _, _, cumulative in modules)
+        runs.append((total, modules, failed, baseline_seconds))
+    return min(runs, key=lambda run: run[0])
+
+
+def report(path, top=15, relative=False, repeat=3, cwd=None):
+    """Print the import profile of a script.
+
+    Returns its total cold import time in seconds, or as a multiple of
+    ``BASELINE_IMPORTS`` (imported first) when ``relative``.
+    """
+    baseline = BASELINE_IMPORTS if relative else ()
+    total, modules, failed, baseline_seconds = fastest_profile(eager_imports(path), baseline, repeat, cwd)
+    if relative:
+        print(f"{path}: {total:.3f}s = {total / baseline_seconds:.2f}x pandas + streamlit ({baseline_seconds:.3f}s)")
+    else:
+        print(f"{path}: {total:.3f}s in {len(modules)} top-level modules")
+    for name, _, cumulative in sorted(modules, key=lambda module: -module[2])[:top]:
+        print(f"  {cumulative:8.3f}s  {name}")
+    for statement in failed:
+        print(f"  not importable: {statement}")
+    return total / baseline_seconds if relative else total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile the cold import time of dashboard scripts.")
+    parser.add_argument("scripts", nargs="*", type=Path, default=[DEFAULT_SCRIPT])
+    parser.add_argument("--top", type=int, default=15, help="modules listed per script")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per script (the fastest is kept)")
+    budget = parser.add_mutually_exclusive_group()
+    budget.add_argument("--budget", type=float, nargs="?", const=IMPORT_BUDGET, default=None,
+                        help=f"fail when a script imports for longer (seconds, {IMPORT_BUDGET} when no value)")
+    budget.add_argument("--relative", type=float, nargs="?", const=IMPORT_BUDGET_RATIO, default=None,
+                        help="fail when a script imports for longer than this multiple of "
+                             f"`import pandas, streamlit` ({IMPORT_BUDGET_RATIO} when no value)")
+    args = parser.parse_args()
+
+    limit = args.budget if args.relative is None else args.relative
+    unit = "s" if args.relative is None else "x"
+    over = []
+    for script in args.scripts:
+        cost = report(script, args.top, relative=args.relative is not None, repeat=args.repeat)
+        if limit is not None and cost > limit:
+            over.append(f"{script}: {cost:.3f}{unit} > {limit:.3f}{unit}")
+    if over:
+        print("Import budget exceeded:\n  " + "\n  ".join(over))
+        sys.exit(1)
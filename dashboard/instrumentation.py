@@ -0,0 +1,61 @@
+"""In-process timings of the dashboard.
+
+Durations are recorded under a name (e.g. ``reply.time_to_first_token``) in
+a bounded window of recent samples shared by all Streamlit sessions of the
+process, logged at INFO level, and summarized (count, mean, p50, p95, last)
+by ``summary``.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAX_SAMPLES = 1000
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+
+
+def record(name, seconds):
+    """Record one duration (in seconds)."""
+    with _lock:
+        _samples[name].append(seconds)
+    logger.info("%s: %.3fs", name, seconds)
+
+
+@contextmanager
+def timed(name):
+    """Record the duration of the ``with`` block."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def summary(name=None):
+    """{name: {count, mean, p50, p95, last}} of the recorded durations (one name or all)."""
+    with _lock:
+        samples = {key: list(values) for key, values in _samples.items() if name is None or key == name}
+    return {
+        key: {
+            "count": len(values),
+            "mean": float(np.mean(values)),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "last": values[-1],
+        }
+        for key, values in samples.items()
+        if values
+    }
+
+
+def reset():
+    with _lock:
+        _samples.clear()
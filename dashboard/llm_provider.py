@@ -0,0 +1,118 @@
+"""Lazily built LLM client of "Generate an answer".
+
+``app.py`` used to import LangChain and ``langchain_mistralai``, load the
+``.env`` and build the Mistral chain at the top of every script run, before
+any data was shown, even for users who never ask for a reply. The dashboard
+now holds an ``LLMProvider``: choosing a backend imports nothing, and the
+chain is built on the first reply only, then shared by all sessions of the
+process (the provider is a Streamlit resource).
+
+Backends are registered by name in ``BACKENDS``:
+
+- ``mistral``: ``ChatMistralAI`` (key from ``MISTRAL_API_KEY``);
+- ``local``: ``LocalEchoChatModel``, an offline stand-in;
+- ``disabled``: no model, the dashboard only shows the replies stored by the
+  Mistral backend (it reads the cache under the Mistral model name).
+
+The dashboard's backend is read from the ``DASHBOARD_LLM_BACKEND``
+environment variable (``mistral`` by default).
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from dashboard import instrumentation
+
+BACKEND_ENV = "DASHBOARD_LLM_BACKEND"
+DEFAULT_BACKEND = "mistral"
+
+MISTRAL_MODEL = "mistral-small-latest"
+LOCAL_MODEL = "local-echo"
+
+# Prompt system
+SYS_PROMPT = """
+You are a manager at McDonald's, responding to client reviews about the restaurant.
+You need to be extremely polite and speak correct English.
+Thank the client for their review.
+If the review mentions a bad experience, apologize for it and invite the client to come again.
+Limit your answer to two sentences.
+"""
+
+
+@dataclass(frozen=True)
+class Backend:
+    """A named chat model: ``model_name`` keys the reply cache, ``factory`` builds the model (None: disabled)."""
+
+    name: str
+    model_name: str
+    factory: Optional[Callable] = None
+
+
+def _mistral():
+    from dashboard.replies import mistral_model
+
+    return mistral_model(model_name=MISTRAL_MODEL)
+
+
+def _local():
+    from dashboard.replies import LocalEchoChatModel
+
+    return LocalEchoChatModel()
+
+
+BACKENDS = {}
+
+
+def register_backend(name, model_name, factory=None):
+    BACKENDS[name] = Backend(name, model_name, factory)
+
+
+register_backend("mistral", MISTRAL_MODEL, _mistral)
+register_backend("local", LOCAL_MODEL, _local)
+register_backend("disabled", MISTRAL_MODEL)  # no factory: reads the Mistral replies only
+
+
+def configured_backend():
+    """Backend name from ``DASHBOARD_LLM_BACKEND`` (``mistral`` when unset)."""
+    return os.getenv(BACKEND_ENV, DEFAULT_BACKEND)
+
+
+class LLMProvider:
+    """Reply chain of one backend, built on first use (thread-safe)."""
+
+    def __init__(self, backend=DEFAULT_BACKEND, sys_prompt=SYS_PROMPT):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown LLM backend {backend!r}, expected one of {sorted(BACKENDS)}")
+        self.backend = BACKENDS[backend]
+        self.sys_prompt = sys_prompt
+        self._chain = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.backend.factory is not None
+
+    @property
+    def model_name(self):
+        return self.backend.model_name
+
+    @property
+    def chain(self):
+        """``template | model | parser`` of the backend (imported and built on the first call)."""
+        if not self.enabled:
+            raise RuntimeError("LLM replies are disabled")
+        with self._lock:
+            if self._chain is None:
+                with instrumentation.timed("llm.build_chain"):
+                    from dashboard.replies import build_chain
+
+                    self._chain = build_chain(self.backend.factory(), self.sys_prompt)
+        return self._chain
+
+    def stream(self, text, timeout=30.0):
+        """Reply to ``text`` chunk by chunk (see ``dashboard.replies.stream_reply``)."""
+        from dashboard.replies import stream_reply
+
+        return stream_reply(self.chain, text, timeout=timeout)
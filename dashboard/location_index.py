@@ -0,0 +1,84 @@
+"""State → City → store_address hierarchy for the sidebar location filters.
+
+Built once per dataset, it replaces the boolean masks, ``dropna().unique()``
+and ``sorted()`` calls that ``apply_filters`` ran on every rerun. Option lists
+are pre-sorted and both directions of the hierarchy are dictionary lookups.
+"""
+
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+ALL = "All"
+
+
+def _sorted_unique(values):
+    return sorted({value for value in values if not pd.isna(value)})
+
+
+@dataclass
+class LocationIndex:
+    """Pre-sorted location option lists with O(1) lookups in both directions."""
+
+    states: list
+    cities: list
+    addresses: list
+    cities_by_state: dict = field(default_factory=dict)
+    addresses_by_state: dict = field(default_factory=dict)
+    addresses_by_city: dict = field(default_factory=dict)
+    addresses_by_state_city: dict = field(default_factory=dict)
+    address_location: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build the index from the State, City and store_address columns."""
+        locations = df[["State", "City", "store_address"]].astype(object)
+        triples = list(locations.drop_duplicates().itertuples(index=False, name=None))
+
+        cities_by_state, addresses_by_state, addresses_by_city, addresses_by_state_city = {}, {}, {}, {}
+        for state, city, address in triples:
+            if not pd.isna(state):
+                cities_by_state.setdefault(state, []).append(city)
+                addresses_by_state.setdefault(state, []).append(address)
+            if not pd.isna(city):
+                addresses_by_city.setdefault(city, []).append(address)
+            if not pd.isna(state) and not pd.isna(city):
+                addresses_by_state_city.setdefault((state, city), []).append(address)
+
+        # First row of each address decides its (State, City), as `.iloc[0]` did
+        first_rows = locations.drop_duplicates(subset="store_address").dropna(subset=["store_address"])
+        address_location = {
+            address: (state, city)
+            for state, city, address in first_rows.itertuples(index=False, name=None)
+        }
+
+        return cls(
+            states=_sorted_unique(state for state, _, _ in triples),
+            cities=_sorted_unique(city for _, city, _ in triples),
+            addresses=_sorted_unique(address for _, _, address in triples),
+            cities_by_state={key: _sorted_unique(values) for key, values in cities_by_state.items()},
+            addresses_by_state={key: _sorted_unique(values) for key, values in addresses_by_state.items()},
+            addresses_by_city={key: _sorted_unique(values) for key, values in addresses_by_city.items()},
+            addresses_by_state_city={key: _sorted_unique(values) for key, values in addresses_by_state_city.items()},
+            address_location=address_location,
+        )
+
+    def city_options(self, state=ALL):
+        """Sorted cities of a state (every city for "All")."""
+        if state == ALL:
+            return self.cities
+        return self.cities_by_state.get(state, [])
+
+    def address_options(self, state=ALL, city=ALL):
+        """Sorted store addresses matching the selected state and city."""
+        if state == ALL and city == ALL:
+            return self.addresses
+        if city == ALL:
+            return self.addresses_by_state.get(state, [])
+        if state == ALL:
+            return self.addresses_by_city.get(city, [])
+        return self.addresses_by_state_city.get((state, city), [])
+
+    def locate(self, address):
+        """Return the (State, City) of a store address."""
+        return self.address_location[address]
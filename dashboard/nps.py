@@ -0,0 +1,84 @@
+"""Vectorized NPS computations on an int8 sentiment code.
+
+``pred_sentiment`` is encoded once, at load time, into ``sentiment_code``:
+
+- 'positive' => +1 (Promoter)
+- 'neutral'  =>  0 (Passive)
+- 'negative' => -1 (Detractor)
+
+Anything else (missing or unknown labels) counts as a Passive, like the former
+``compute_nps_value``. Counts are taken with ``np.bincount`` so that grouping
+by store, day or any other key never goes through Python lambdas.
+"""
+
+import numpy as np
+import pandas as pd
+
+PROMOTER, PASSIVE, DETRACTOR = 1, 0, -1
+SENTIMENT_CODES = {"positive": PROMOTER, "neutral": PASSIVE, "negative": DETRACTOR}
+
+CODE_COLUMN = "sentiment_code"
+
+
+def encode_sentiment(sentiment):
+    """Encode a ``pred_sentiment`` Series as an int8 array of NPS codes."""
+    codes = pd.Series(sentiment).astype(object).map(SENTIMENT_CODES).fillna(PASSIVE)
+    return codes.to_numpy(dtype=np.int8)
+
+
+def with_sentiment_codes(df):
+    """Add the ``sentiment_code`` column when the data source does not carry it yet."""
+    if CODE_COLUMN not in df.columns and "pred_sentiment" in df.columns:
+        df[CODE_COLUMN] = encode_sentiment(df["pred_sentiment"])
+    return df
+
+
+def sentiment_counts(codes, groups=None, n_groups=None):
+    """Count detractors, passives and promoters.
+
+    Without ``groups`` returns an array ``[detractors, passives, promoters]``.
+    With integer group ids (0..n_groups-1) returns an (n_groups, 3) array.
+    """
+    codes = np.asarray(codes, dtype=np.int64) + 1  # -1/0/1 -> 0/1/2
+    if groups is None:
+        return np.bincount(codes, minlength=3)
+    if n_groups is None:
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+    flat = np.asarray(groups, dtype=np.int64) * 3 + codes
+    return np.bincount(flat, minlength=n_groups * 3).reshape(n_groups, 3)
+
+
+def counts_by(codes, keys):
+    """Detractors/passives/promoters/reviews per distinct key, as a DataFrame."""
+    group_ids, uniques = pd.factorize(keys, sort=True)
+    valid = group_ids >= 0  # missing keys are dropped, like groupby
+    counts = sentiment_counts(np.asarray(codes)[valid], group_ids[valid], len(uniques))
+    table = pd.DataFrame(counts, columns=["detractors", "passives", "promoters"], index=uniques)
+    table["reviews"] = counts.sum(axis=1)
+    return table
+
+
+def nps_from_counts(promoters, detractors, total):
+    """NPS = %promoters - %detractors (NaN when there is no review)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (np.asarray(promoters) - np.asarray(detractors)) / np.asarray(total, dtype=float) * 100
+
+
+def shares_from_counts(promoters, passives, detractors):
+    """Promoter, passive and detractor shares in % (NaN when there is no review)."""
+    total = promoters + passives + detractors
+    if not total:
+        return float("nan"), float("nan"), float("nan")
+    return promoters / total * 100, passives / total * 100, detractors / total * 100
+
+
+def nps(codes):
+    """NPS of a set of reviews."""
+    detractors, _, promoters = sentiment_counts(codes)
+    return float(nps_from_counts(promoters, detractors, len(codes)))
+
+
+def shares(codes):
+    """Promoter, passive and detractor shares in % of a set of reviews."""
+    detractors, passives, promoters = sentiment_counts(codes)
+    return shares_from_counts(promoters, passives, detractors)
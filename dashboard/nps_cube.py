@@ -0,0 +1,142 @@
+"""Pre-aggregated sentiment counts by store × day for the Overview tab.
+
+Every review is counted once, at load time, into a cell keyed by its store
+(store_address, City, State, latitude, longitude) and its ``review_date``
+(normalized to midnight by ``data_preprocessing.ipynb``, so one cell per
+store-day). The Overview metrics, the NPS bar chart and the map only sum the
+cells matching the sidebar filters: their cost is O(stores × days) and no
+longer grows with the number of reviews.
+
+``stores`` is the store dimension: one row per store, whose position is its
+store id. The located stores (coordinates, City, State) are prepared once for
+the US map, which ``map_layer`` fills with the counts of the filters.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard.nps import CODE_COLUMN, encode_sentiment, nps_from_counts, sentiment_counts, shares_from_counts
+
+ALL = "All"
+
+STORE_COLUMNS = ["store_address", "City", "State", "latitude", "longitude"]
+COUNT_COLUMNS = ["promoters", "passives", "detractors", "commented"]
+
+# US map: stores with more commented reviews than MAP_MIN_REVIEWS, bubble size capped at MAP_MAX_SIZE
+MAP_MIN_REVIEWS = 100
+MAP_MAX_SIZE = 100
+
+
+class NpsCube:
+    """Sentiment counts per (store, review day), sorted by day."""
+
+    def __init__(self, df):
+        dates = df["review_date"].to_numpy()
+        valid = ~np.isnat(dates)
+
+        stores = df[STORE_COLUMNS].astype(object)
+        store_ids = stores.groupby(STORE_COLUMNS, dropna=False, sort=False).ngroup().to_numpy()
+        self.stores = stores.drop_duplicates().reset_index(drop=True)
+
+        # located stores in map order, with their store id
+        located = self.stores.dropna(subset=STORE_COLUMNS).sort_values(STORE_COLUMNS)
+        self.map_stores = pd.DataFrame({
+            "store_id": located.index.to_numpy(),
+            "store_address": located["store_address"].to_numpy(),
+            "City": located["City"].to_numpy(),
+            "State": located["State"].to_numpy(),
+            "latitude": located["latitude"].to_numpy(dtype=float),
+            "longitude": located["longitude"].to_numpy(dtype=float),
+        })
+
+        if CODE_COLUMN in df.columns:
+            codes = df[CODE_COLUMN].to_numpy()
+        else:
+            codes = encode_sentiment(df["pred_sentiment"])
+
+        keys = pd.DataFrame({"day": dates[valid], "store": store_ids[valid]})
+        cell_ids = keys.groupby(["day", "store"], sort=True).ngroup().to_numpy()
+        cells = keys.drop_duplicates().sort_values(["day", "store"])
+        counts = sentiment_counts(codes[valid], cell_ids, len(cells))
+        commented = df["clean_reviews"].notna().to_numpy()[valid]
+
+        self.day = cells["day"].to_numpy()
+        self.store = cells["store"].to_numpy()
+        self.detractors, self.passives, self.promoters = counts.T
+        self.commented = np.bincount(cell_ids, weights=commented, minlength=len(cells)).astype(np.int64)
+
+    def _store_mask(self, state, city, address):
+        mask = np.ones(len(self.stores), dtype=bool)
+        if state != ALL:
+            mask &= (self.stores["State"] == state).to_numpy()
+        if city != ALL:
+            mask &= (self.stores["City"] == city).to_numpy()
+        if address != ALL:
+            mask &= (self.stores["store_address"] == address).to_numpy()
+        return mask
+
+    def counts(self, start_date, end_date, state=ALL, city=ALL, address=ALL):
+        """{count column: counts indexed by store id} for the filters."""
+        start = np.datetime64(pd.Timestamp(start_date)).astype(self.day.dtype)
+        end = np.datetime64(pd.Timestamp(end_date)).astype(self.day.dtype)
+        lo = np.searchsorted(self.day, start, side="left")
+        hi = np.searchsorted(self.day, end, side="right")
+
+        store = self.store[lo:hi]
+        keep = self._store_mask(state, city, address)[store]
+        store = store[keep]
+
+        return {
+            column: np.bincount(store, weights=getattr(self, column)[lo:hi][keep], minlength=len(self.stores)).astype(np.int64)
+            for column in COUNT_COLUMNS
+        }
+
+    def query(self, start_date, end_date, state=ALL, city=ALL, address=ALL):
+        """Counts per store for the filters, one row per store with at least one review."""
+        per_store = self.stores.copy()
+        for column, values in self.counts(start_date, end_date, state, city, address).items():
+            per_store[column] = values
+        per_store["review_count"] = per_store[["promoters", "passives", "detractors"]].sum(axis=1)
+        return per_store[per_store["review_count"] > 0].reset_index(drop=True)
+
+    def map_layer(self, start_date, end_date, state=ALL, city=ALL, address=ALL,
+                  min_reviews=MAP_MIN_REVIEWS, max_size=MAP_MAX_SIZE):
+        """Store bubbles of the US map for the filters.
+
+        Located stores with more than ``min_reviews`` commented reviews:
+        ``review_count`` (commented reviews), ``nps_score`` and ``size_scaled``
+        (``review_count`` capped at ``max_size``).
+        """
+        counts = self.counts(start_date, end_date, state, city, address)
+        ids = self.map_stores["store_id"].to_numpy()
+        promoters, detractors = counts["promoters"][ids], counts["detractors"][ids]
+        total = promoters + counts["passives"][ids] + detractors
+        commented = counts["commented"][ids]
+
+        keep = (total > 0) & (commented > min_reviews)
+        map_data = self.map_stores[keep].drop(columns="store_id").reset_index(drop=True)
+        map_data["review_count"] = commented[keep]
+        map_data["nps_score"] = nps_from_counts(promoters[keep], detractors[keep], total[keep])
+        map_data["size_scaled"] = np.minimum(commented[keep], max_size)
+        return map_data
+
+
+def summarize(per_store):
+    """Total reviews and promoter/passive/detractor shares (in %) of a query result."""
+    promoters, passives, detractors = (int(per_store[column].sum()) for column in ["promoters", "passives", "detractors"])
+    shares = dict(zip(["promoters", "passives", "detractors"], shares_from_counts(promoters, passives, detractors)))
+    return promoters + passives + detractors, shares
+
+
+def restaurant_table(per_store):
+    """NPS per store address, as grouped by ``store_address`` in the bar chart."""
+    located = per_store.dropna(subset=["store_address"])
+    grouped = located.groupby("store_address", sort=True).agg(
+        promoters=("promoters", "sum"),
+        detractors=("detractors", "sum"),
+        review_count=("review_count", "sum"),
+        City=("City", "first"),
+        State=("State", "first"),
+    ).reset_index()
+    grouped.insert(1, "NPS", nps_from_counts(grouped["promoters"], grouped["detractors"], grouped["review_count"]))
+    return grouped[["store_address", "NPS", "review_count", "City", "State"]]
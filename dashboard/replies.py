@@ -0,0 +1,146 @@
+"""Reply generation chain of "Generate an answer".
+
+The LangChain ``template | model | parser`` chain used to be built inline in
+``app.py``; it lives here so that the dashboard and the bulk job
+(``pipeline.bulk_replies``) share the same prompt (``SYS_PROMPT``, defined in
+``dashboard.llm_provider`` with the model names), and therefore the same reply
+cache keys. Both get their chain through ``dashboard.llm_provider``.
+
+``LocalEchoChatModel`` is an offline stand-in for the Mistral model: it
+answers every review with a fixed polite reply, optionally after a delay and
+streamed word by word, so the chain can be exercised without an API key.
+
+``stream_reply`` streams a reply from the chain on a worker thread, so that a
+slow first token can time out and an abandoned stream (the user moved to
+another page, which interrupts the Streamlit run) stops the request.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.prompts import ChatPromptTemplate
+
+from dashboard import instrumentation
+from dashboard.llm_provider import LOCAL_MODEL, MISTRAL_MODEL, SYS_PROMPT
+
+
+class LocalEchoChatModel(BaseChatModel):
+    """Offline chat model returning a canned reply (for tests and demos).
+
+    ``latency`` delays the reply (the first token when streaming) and
+    ``token_delay`` separates the streamed words.
+    """
+
+    latency: float = 0.0
+    token_delay: float = 0.0
+    reply: str = (
+        "Thank you for taking the time to share your review. "
+        "We are sorry if anything fell short and hope to welcome you again soon."
+    )
+
+    @property
+    def _llm_type(self):
+        return LOCAL_MODEL
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for i, word in enumerate(self.reply.split(" ")):
+            delay = self.latency if i == 0 else self.token_delay
+            if delay:
+                time.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for i, word in enumerate(self.reply.split(" ")):
+            delay = self.latency if i == 0 else self.token_delay
+            if delay:
+                await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+
+
+def mistral_model(api_key=None, model_name=MISTRAL_MODEL):
+    """The Mistral chat model (key from ``MISTRAL_API_KEY`` in the ``.env`` when not given)."""
+    import os
+
+    from dotenv import load_dotenv
+    from langchain_mistralai import ChatMistralAI
+
+    load_dotenv()
+    return ChatMistralAI(model=model_name, mistral_api_key=api_key or os.getenv("MISTRAL_API_KEY"))
+
+
+def build_chain(model, sys_prompt=SYS_PROMPT):
+    """``template | model | parser``: takes ``{"text": review}``, returns the reply string."""
+    template = ChatPromptTemplate.from_messages([
+        ("system", sys_prompt),
+        ("user", "{text}"),
+    ])
+    return template | model | StrOutputParser()
+
+
+_DONE = object()
+
+
+def stream_reply(chain, text, timeout=30.0, cancel=None):
+    """Yield the reply of ``chain`` to ``text`` chunk by chunk.
+
+    The chain is consumed on a worker thread. Raises ``TimeoutError`` when the
+    whole reply takes longer than ``timeout`` seconds; stops early (without
+    error) when the ``cancel`` event is set. Closing the generator stops the
+    worker too. Time to first token and total time are recorded in
+    ``dashboard.instrumentation``.
+    """
+    chunks = queue.Queue()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for chunk in chain.stream({"text": text}):
+                if stop.is_set():
+                    return
+                chunks.put(chunk)
+            chunks.put(_DONE)
+        except Exception as e:  # surfaced in the consumer
+            chunks.put(e)
+
+    started = time.perf_counter()
+    deadline = started + timeout
+    first = True
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            if cancel is not None and cancel.is_set():
+                return
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise TimeoutError(f"no complete reply after {timeout:g}s")
+            try:
+                chunk = chunks.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                continue
+            if chunk is _DONE:
+                instrumentation.record("reply.total", time.perf_counter() - started)
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            if first:
+                instrumentation.record("reply.time_to_first_token", time.perf_counter() - started)
+                first = False
+            yield chunk
+    finally:
+        stop.set()
@@ -0,0 +1,205 @@
+"""Persistent cache of the LLM replies of "Generate an answer".
+
+Each click used to call the Mistral chain again, for every user and every
+rerun. Replies are now kept in a small SQLite database keyed by the
+normalized review text, the hash of the system prompt and the model name:
+the same review answered with the same prompt and model is served from disk,
+across sessions and restarts. Entries expire after a TTL and the least
+recently used ones are evicted above ``max_entries``. Hits and misses are
+counted in the database.
+
+Usage::
+
+    python -m dashboard.reply_cache stats
+    python -m dashboard.reply_cache purge
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+REPLIES_PATH = Path("data/llm_replies.sqlite")
+
+DEFAULT_TTL = 30 * 24 * 3600  # seconds
+DEFAULT_MAX_ENTRIES = 50_000
+
+# SQLite limits the number of bound parameters per statement
+_CHUNK = 500
+
+
+def normalize_text(text):
+    """Review text as used in the cache key (Unicode NFKC, collapsed whitespace, case-folded)."""
+    return " ".join(unicodedata.normalize("NFKC", str(text)).split()).casefold()
+
+
+def prompt_hash(sys_prompt):
+    return hashlib.sha1(sys_prompt.encode("utf-8")).hexdigest()[:12]
+
+
+def reply_key(text, sys_prompt, model_name):
+    """Cache key of a (review, prompt, model) triple."""
+    parts = (normalize_text(text), prompt_hash(sys_prompt), model_name)
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ReplyCache:
+    """SQLite reply cache with TTL and LRU eviction (safe to share between Streamlit sessions)."""
+
+    def __init__(self, path=REPLIES_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS replies (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                review TEXT NOT NULL,
+                reply TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS replies_last_used ON replies (last_used_at);
+            CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0);
+            """
+        )
+        self.connection.commit()
+
+    def _count(self, name):
+        self.connection.execute("UPDATE counters SET value = value + 1 WHERE name = ?", [name])
+
+    def get(self, text, sys_prompt, model_name):
+        """Cached reply, or None (counted as a miss) when absent or expired."""
+        key = reply_key(text, sys_prompt, model_name)
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute("SELECT reply, created_at FROM replies WHERE key = ?", [key]).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self.connection.execute("DELETE FROM replies WHERE key = ?", [key])
+                row = None
+            if row is None:
+                self._count("misses")
+            else:
+                self._count("hits")
+                self.connection.execute("UPDATE replies SET last_used_at = ? WHERE key = ?", [now, key])
+            self.connection.commit()
+        return None if row is None else row[0]
+
+    def put(self, text, sys_prompt, model_name, reply):
+        """Store a reply and evict expired / least recently used entries."""
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO replies VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [reply_key(text, sys_prompt, model_name), model_name, prompt_hash(sys_prompt), str(text), reply, now, now],
+            )
+            self._evict(now)
+            self.connection.commit()
+
+    def lookup(self, texts, sys_prompt, model_name, count=True):
+        """{text: reply} of the texts with a live cached reply.
+
+        Replies found are counted as hits and marked as used (LRU), unless
+        ``count`` is False (the bulk job checking what is left to generate).
+        Texts without a reply are not misses: no reply was asked for them.
+        """
+        keys = {reply_key(text, sys_prompt, model_name): text for text in texts}
+        now = time.time()
+        oldest = 0 if self.ttl is None else now - self.ttl
+        found = {}
+        chunks = list(keys)
+        for start in range(0, len(chunks), _CHUNK):
+            chunk = chunks[start:start + _CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            with self.lock:
+                rows = self.connection.execute(
+                    f"SELECT key, reply FROM replies WHERE created_at >= ? AND key IN ({placeholders})",
+                    [oldest, *chunk],
+                ).fetchall()
+                if count and rows:
+                    hits = [key for key, _ in rows]
+                    self.connection.execute(
+                        f"UPDATE replies SET last_used_at = ? WHERE key IN ({','.join('?' * len(hits))})",
+                        [now, *hits],
+                    )
+                    self.connection.execute("UPDATE counters SET value = value + ? WHERE name = 'hits'", [len(hits)])
+                    self.connection.commit()
+            found.update((keys[key], reply) for key, reply in rows)
+        return found
+
+    def put_many(self, replies, sys_prompt, model_name):
+        """Store {text: reply} in one transaction."""
+        now = time.time()
+        with self.lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO replies VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (reply_key(text, sys_prompt, model_name), model_name, prompt_hash(sys_prompt), str(text), reply, now, now)
+                    for text, reply in replies.items()
+                ],
+            )
+            self._evict(now)
+            self.connection.commit()
+
+    def get_or_create(self, text, sys_prompt, model_name, generate):
+        """Cached reply, or ``generate()`` stored for the next request."""
+        reply = self.get(text, sys_prompt, model_name)
+        if reply is None:
+            reply = generate()
+            self.put(text, sys_prompt, model_name, reply)
+        return reply
+
+    def _evict(self, now):
+        if self.ttl is not None:
+            self.connection.execute("DELETE FROM replies WHERE created_at < ?", [now - self.ttl])
+        if self.max_entries is not None:
+            self.connection.execute(
+                "DELETE FROM replies WHERE key IN "
+                "(SELECT key FROM replies ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                [self.max_entries],
+            )
+
+    def purge(self):
+        """Drop expired entries (and the oldest ones above ``max_entries``)."""
+        with self.lock:
+            self._evict(time.time())
+            self.connection.commit()
+
+    def stats(self):
+        """Entries, hits, misses and hit rate."""
+        with self.lock:
+            counters = dict(self.connection.execute("SELECT name, value FROM counters"))
+            entries = self.connection.execute("SELECT COUNT(*) FROM replies").fetchone()[0]
+        requests = counters["hits"] + counters["misses"]
+        return {
+            "entries": entries,
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "hit_rate": counters["hits"] / requests if requests else 0.0,
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or purge the LLM reply cache.")
+    parser.add_argument("command", choices=["stats", "purge"])
+    parser.add_argument("--path", type=Path, default=REPLIES_PATH)
+    args = parser.parse_args()
+
+    cache = ReplyCache(args.path)
+    if args.command == "purge":
+        cache.purge()
+    for name, value in cache.stats().items():
+        print(f"{name}: {value:.2%}" if name == "hit_rate" else f"{name}: {value:,}")
+    cache.close()
@@ -0,0 +1,139 @@
+"""Columnar (Parquet) review store for the dashboard.
+
+The CSV produced by ``notebooks/embeding.ipynb`` is slow to parse: every
+Streamlit worker re-reads all the text, re-parses ``review_date`` and carries
+the stringified ``review_embedded`` vectors it never uses. This module converts
+it once into a typed Parquet file and reads back only the columns a dashboard
+section needs.
+
+Convert the CSV once with::
+
+    python -m dashboard.review_store "data/data_avec_labels.csv" data/data_avec_labels.parquet
+"""
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dashboard.nps import CODE_COLUMN, with_sentiment_codes
+from dashboard.topic_registry import TopicRegistry
+
+# Labels of the topic registry (dashboard/topics.json), one score column each
+TOPIC_LABELS = TopicRegistry.load().labels
+
+LOCATION_COLUMNS = ["State", "City", "store_address"]
+
+# Columns never written to the store (embedding text is only useful to the notebooks)
+DROPPED_COLUMNS = ["Unnamed: 0", "review_embedded"]
+
+_categorical = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMA = pa.schema(
+    [
+        ("reviewer_id", pa.int64()),
+        ("pred_sentiment", _categorical),
+        (CODE_COLUMN, pa.int8()),
+        ("RoBERTa_score", pa.float64()),
+        ("review", pa.string()),
+        ("clean_reviews", pa.string()),
+    ]
+    + [(label, pa.float32()) for label in TOPIC_LABELS]
+    + [
+        ("review_time", pa.string()),
+        ("review_date", pa.timestamp("ns")),
+        ("store_address", _categorical),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("City", _categorical),
+        ("State", _categorical),
+        ("rating_int", pa.int16()),
+        ("actual_sentiment", _categorical),
+    ]
+)
+
+# Columns read by each section of app.py
+SECTION_COLUMNS = {
+    "filters": ["review_date"] + LOCATION_COLUMNS,
+    "overview": ["pred_sentiment", CODE_COLUMN, "review"],
+    "map": ["latitude", "longitude", "City", "State", "store_address", "pred_sentiment", CODE_COLUMN, "clean_reviews"],
+    "topics": ["pred_sentiment", CODE_COLUMN] + TOPIC_LABELS,
+    "comments": ["review", "pred_sentiment", CODE_COLUMN, "RoBERTa_score"] + TOPIC_LABELS,
+}
+
+
+def columns_for(*sections):
+    """Return the de-duplicated list of columns needed by the given sections."""
+    columns = []
+    for section in sections:
+        for column in SECTION_COLUMNS[section]:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def read_reviews_csv(path):
+    """Read the labelled review CSV with the same cleaning as the dashboard."""
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip()  # Clean column names
+    df = df.drop(columns=DROPPED_COLUMNS, errors="ignore")
+    df["review_date"] = pd.to_datetime(df["review_date"])
+    return with_sentiment_codes(df)
+
+
+def to_table(df):
+    """Convert a review DataFrame to an Arrow table following ``SCHEMA``.
+
+    Columns missing from the schema keep their inferred Arrow type.
+    """
+    arrays, fields = [], []
+    for column in df.columns:
+        if column in SCHEMA.names:
+            field = SCHEMA.field(column)
+            if pa.types.is_dictionary(field.type):
+                # Sorted categories so that groupby/unique keep the CSV ordering
+                categories = pd.Categorical(df[column].astype("string"))
+                array = pa.array(categories, from_pandas=True).cast(field.type)
+            else:
+                array = pa.array(df[column], type=field.type, from_pandas=True)
+        else:
+            array = pa.array(df[column], from_pandas=True)
+            field = pa.field(column, array.type)
+        arrays.append(array)
+        fields.append(field)
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def convert_csv(csv_path, store_path):
+    """One-shot conversion of the review CSV into the Parquet store."""
+    table = to_table(read_reviews_csv(csv_path))
+    Path(store_path).parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, store_path, compression="zstd")
+    return table.num_rows
+
+
+def load_reviews(path, sections=None, columns=None):
+    """Load reviews from the Parquet store.
+
+    Only the columns needed by ``sections`` (or the explicit ``columns`` list)
+    are read. Location and sentiment columns come back as pandas categoricals
+    and ``review_date`` as ``datetime64``.
+    """
+    if columns is None and sections is not None:
+        columns = columns_for(*sections)
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [column for column in columns if column in available]
+    table = pq.read_table(path, columns=columns)
+    return with_sentiment_codes(table.to_pandas())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the review CSV into the Parquet store.")
+    parser.add_argument("csv_path", type=Path)
+    parser.add_argument("store_path", type=Path)
+    args = parser.parse_args()
+    rows = convert_csv(args.csv_path, args.store_path)
+    print(f"Wrote {rows:,} reviews to {args.store_path}")
@@ -0,0 +1,70 @@
+"""Memory-mapped, read-only review dataset shared by every session and worker.
+
+``load_data`` goes through ``st.cache_data``, which pickles the DataFrame and
+hands each session its own copy. In shared mode the store is exported once to
+an uncompressed Arrow IPC file and memory-mapped: numeric, timestamp and text
+columns are zero-copy views over the mapped pages, so every Streamlit session
+(through ``st.cache_resource``) and every worker process on the host reads the
+same physical copy from the OS page cache.
+
+The returned frame is read-only: numeric buffers raise on in-place writes and
+callers must never add columns to it.
+
+Export the store once with::
+
+    python -m dashboard.shared_dataset data/data_avec_labels.parquet data/data_avec_labels.arrow
+"""
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dashboard.nps import CODE_COLUMN, encode_sentiment, with_sentiment_codes
+from dashboard.review_store import columns_for, read_reviews_csv, to_table
+
+
+def export_arrow(source_path, arrow_path):
+    """Write the review store (Parquet or CSV) as an uncompressed Arrow IPC file."""
+    source_path = Path(source_path)
+    if source_path.suffix == ".csv":
+        table = to_table(read_reviews_csv(source_path))
+    else:
+        table = pq.read_table(source_path)
+        if CODE_COLUMN not in table.column_names:
+            codes = encode_sentiment(table.column("pred_sentiment").to_pandas())
+            table = table.append_column(pa.field(CODE_COLUMN, pa.int8()), pa.array(codes))
+    # No compression: buffers must be usable in place once memory-mapped
+    with pa.OSFile(str(arrow_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return table.num_rows
+
+
+def _types_mapper(arrow_type):
+    # Keep text in Arrow buffers instead of copying it into pandas strings
+    if arrow_type == pa.string():
+        return pd.ArrowDtype(pa.string())
+    return None
+
+
+def open_shared(arrow_path, sections=None, columns=None):
+    """Memory-map the Arrow file and return a zero-copy, read-only DataFrame."""
+    if columns is None and sections is not None:
+        columns = columns_for(*sections)
+    source = pa.memory_map(str(arrow_path), "r")
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select([column for column in columns if column in table.column_names])
+    return with_sentiment_codes(table.to_pandas(split_blocks=True, types_mapper=_types_mapper))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the review store as a memory-mappable Arrow file.")
+    parser.add_argument("source_path", type=Path, help="Parquet store or labelled review CSV")
+    parser.add_argument("arrow_path", type=Path)
+    args = parser.parse_args()
+    rows = export_arrow(args.source_path, args.arrow_path)
+    print(f"Wrote {rows:,} reviews to {args.arrow_path}")
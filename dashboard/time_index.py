@@ -0,0 +1,83 @@
+"""Date-sorted review index for the period and location filters.
+
+Row positions are kept sorted by ``review_date``, once globally and once per
+store (State, City, store_address). A date range then becomes two
+``searchsorted`` calls on each matching partition instead of full-length
+boolean masks, and location filters only touch the partitions of the selected
+stores: filtering costs O(log rows + result) instead of O(rows).
+"""
+
+import numpy as np
+import pandas as pd
+
+ALL = "All"
+
+KEY_COLUMNS = ["State", "City", "store_address"]
+
+
+class ReviewTimeIndex:
+    """Row positions sorted by date, globally and per store partition."""
+
+    def __init__(self, df):
+        dates = df["review_date"].to_numpy()
+        valid = ~np.isnat(dates)
+
+        # Global ordering: whole-dataset date ranges are a single slice
+        order = np.flatnonzero(valid)
+        order = order[np.argsort(dates[order], kind="stable")]
+        self.dates = dates[order]
+        self.positions = order
+
+        # Per-store ordering: rows sorted by (partition, date)
+        keys = df[KEY_COLUMNS].astype(object)
+        codes = keys.groupby(KEY_COLUMNS, dropna=False, sort=False).ngroup().to_numpy()
+        partitioned = np.flatnonzero(valid)
+        partitioned = partitioned[np.lexsort((dates[partitioned], codes[partitioned]))]
+        self.partition_dates = dates[partitioned]
+        self.partition_positions = partitioned
+        n_partitions = codes.max() + 1 if len(codes) else 0
+        self.offsets = np.searchsorted(codes[partitioned], np.arange(n_partitions + 1))
+
+        partition_keys = keys.drop_duplicates().reset_index(drop=True)
+        # Same order as ngroup(sort=False): first appearance of each key
+        self.partition_state = partition_keys["State"].to_numpy()
+        self.partition_city = partition_keys["City"].to_numpy()
+        self.partition_address = partition_keys["store_address"].to_numpy()
+
+        self.min_date = pd.Timestamp(self.dates[0]) if len(self.dates) else pd.NaT
+        self.max_date = pd.Timestamp(self.dates[-1]) if len(self.dates) else pd.NaT
+
+    def _bound(self, value):
+        return np.datetime64(pd.Timestamp(value)).astype(self.dates.dtype)
+
+    def select(self, start_date, end_date, state=ALL, city=ALL, address=ALL):
+        """Sorted row positions with ``start_date <= review_date <= end_date`` at the given location."""
+        start, end = self._bound(start_date), self._bound(end_date)
+
+        if state == ALL and city == ALL and address == ALL:
+            lo = np.searchsorted(self.dates, start, side="left")
+            hi = np.searchsorted(self.dates, end, side="right")
+            return np.sort(self.positions[lo:hi])
+
+        matches = np.ones(len(self.partition_state), dtype=bool)
+        if state != ALL:
+            matches &= self.partition_state == state
+        if city != ALL:
+            matches &= self.partition_city == city
+        if address != ALL:
+            matches &= self.partition_address == address
+
+        slices = []
+        for partition in np.flatnonzero(matches):
+            first, last = self.offsets[partition], self.offsets[partition + 1]
+            dates = self.partition_dates[first:last]
+            lo = first + np.searchsorted(dates, start, side="left")
+            hi = first + np.searchsorted(dates, end, side="right")
+            slices.append(self.partition_positions[lo:hi])
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(slices))
+
+    def filter(self, df, start_date, end_date, state=ALL, city=ALL, address=ALL):
+        """Rows of ``df`` matching the filters, in their original order."""
+        return df.take(self.select(start_date, end_date, state, city, address))
@@ -0,0 +1,75 @@
+"""Packed-bit topic membership index for the topic filters and counts.
+
+The comment panes and the topic charts re-thresholded the float topic columns
+on every rerun. Here each topic label (score above its threshold) and each
+sentiment code is turned once into a bitmap over the row positions of the
+dataset, packed into 64-bit words. Filtering a pane by topic and sentiment,
+counting the topic mentions of promoters or detractors within the sidebar
+filters, and any topic × sentiment intersection are then word-wise ANDs and
+popcounts: a million reviews are 15,625 words per bitmap.
+"""
+
+import numpy as np
+
+from dashboard.nps import CODE_COLUMN, DETRACTOR, PASSIVE, PROMOTER
+from dashboard.topic_stats import topic_hits
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:  # numpy < 2.0
+    _BYTE_COUNTS = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+    def _popcount(words):
+        return _BYTE_COUNTS[np.ascontiguousarray(words).view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+class TopicBitmapIndex:
+    """Row bitmaps per topic label (at its threshold) and per sentiment code."""
+
+    def __init__(self, df, labels, thresholds):
+        self.labels = list(labels)
+        self.n_rows = len(df)
+        self.n_words = -(-self.n_rows // 64)
+        # padding bits of the last word stay clear
+        self.all_rows = self.pack(np.ones(self.n_rows, dtype=bool))
+
+        hits = topic_hits(df, self.labels, thresholds)
+        self.topics = np.stack([self.pack(column) for column in hits.T]) if self.labels else np.empty((0, self.n_words), np.uint64)
+        self.label_rows = {label: i for i, label in enumerate(self.labels)}
+        codes = df[CODE_COLUMN].to_numpy()
+        self.sentiments = {code: self.pack(codes == code) for code in (PROMOTER, PASSIVE, DETRACTOR)}
+
+    def pack(self, flags):
+        """Bitmap (uint64 words) of a boolean array over the rows."""
+        packed = np.zeros(self.n_words * 8, dtype=np.uint8)
+        packed[:(self.n_rows + 7) // 8] = np.packbits(flags, bitorder="little")
+        return packed.view(np.uint64)
+
+    def row_bits(self, positions):
+        """Bitmap of the given row positions (e.g. ``ReviewTimeIndex.select``)."""
+        flags = np.zeros(self.n_rows, dtype=bool)
+        flags[positions] = True
+        return self.pack(flags)
+
+    def bits(self, row_bits=None, code=None, label=None):
+        """Intersection of a row bitmap, a sentiment code and a topic label (each optional)."""
+        result = (self.all_rows if row_bits is None else row_bits).copy()
+        if code is not None:
+            result &= self.sentiments[code]
+        if label is not None:
+            result &= self.topics[self.label_rows[label]]
+        return result
+
+    def count(self, row_bits=None, code=None, label=None):
+        """Number of rows in the intersection."""
+        return int(_popcount(self.bits(row_bits, code, label)))
+
+    def counts(self, row_bits=None, code=None):
+        """Rows of each topic label within the row bitmap and sentiment code, in ``labels`` order."""
+        return _popcount(self.topics & self.bits(row_bits, code))
+
+    def rows(self, row_bits=None, code=None, label=None):
+        """Sorted row positions of the intersection."""
+        flags = np.unpackbits(self.bits(row_bits, code, label).view(np.uint8), count=self.n_rows, bitorder="little")
+        return np.flatnonzero(flags)
@@ -0,0 +1,94 @@
+"""Topic registry: the topic labels, their synonyms and per-label thresholds.
+
+The label list used to be hard-coded in ``app.py``, each ``app/*.py`` variant
+and ``notebooks/embeding.ipynb``, with a single ``seuil = 0.2``. It now lives
+in ``dashboard/topics.json``::
+
+    {"topics": [{"label": "hygiene", "synonyms": ["cleanliness"], "threshold": 0.2}, ...]}
+
+A topic column holds the best cosine score of the review against the label
+and its synonyms (see ``pipeline.topic_scoring``). Each topic has a
+fingerprint of its texts: adding or editing a topic only re-scores that
+column, and changing a threshold re-scores nothing.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+REGISTRY_PATH = Path(__file__).with_name("topics.json")
+
+DEFAULT_THRESHOLD = 0.2
+
+
+@dataclass
+class Topic:
+    label: str
+    synonyms: list = field(default_factory=list)
+    threshold: float = DEFAULT_THRESHOLD
+
+    @property
+    def texts(self):
+        """Texts embedded for this topic (the label first)."""
+        return [self.label, *self.synonyms]
+
+    @property
+    def fingerprint(self):
+        """Hash of the embedded texts: a new fingerprint means the column must be re-scored."""
+        return hashlib.sha1("\n".join(self.texts).encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class TopicRegistry:
+    topics: list
+
+    @classmethod
+    def load(cls, path=REGISTRY_PATH):
+        config = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls([Topic(**topic) for topic in config["topics"]])
+
+    def save(self, path=REGISTRY_PATH):
+        config = {"topics": [asdict(topic) for topic in self.topics]}
+        Path(path).write_text(json.dumps(config, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    @property
+    def labels(self):
+        return [topic.label for topic in self.topics]
+
+    def get(self, label):
+        for topic in self.topics:
+            if topic.label == label:
+                return topic
+        raise KeyError(label)
+
+    def upsert(self, label, synonyms=None, threshold=None):
+        """Add a topic, or update the synonyms/threshold of an existing one."""
+        try:
+            topic = self.get(label)
+        except KeyError:
+            topic = Topic(label)
+            self.topics.append(topic)
+        if synonyms is not None:
+            topic.synonyms = list(synonyms)
+        if threshold is not None:
+            topic.threshold = float(threshold)
+        return topic
+
+    def remove(self, label):
+        self.topics.remove(self.get(label))
+
+    def fingerprints(self):
+        return {topic.label: topic.fingerprint for topic in self.topics}
+
+    def available(self, columns):
+        """Labels of the registry that have a score column in ``columns``."""
+        columns = set(columns)
+        return [label for label in self.labels if label in columns]
+
+    def thresholds(self, labels=None):
+        """Threshold of each label, as a Series indexed by label (compares against ``df[labels]``)."""
+        labels = self.labels if labels is None else labels
+        return pd.Series([self.get(label).threshold for label in labels], index=labels, dtype="float64")
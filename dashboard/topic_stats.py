@@ -0,0 +1,50 @@
+"""Topic counts and ratios for the Review Trends tab.
+
+The tab used to build ``topic_df`` with one scalar ``.loc`` write per topic
+and statistic into ``None``-initialised (object) columns, re-summing the
+count columns on every iteration. Here the (reviews × labels) hit matrix is
+reduced once for promoters and detractors (or the counts are read from
+``dashboard.topic_index``) and all ratios are computed as float64 columns.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard.nps import DETRACTOR, PROMOTER
+
+def topic_hits(df, labels, thresholds):
+    """Boolean (reviews × labels) matrix: topic score above the label's threshold."""
+    return df[list(labels)].to_numpy() > np.asarray(thresholds, dtype=np.float64)
+
+
+def ratios_from_counts(positive, negative, labels):
+    """Ratios table from the per-label mention counts in promoter and detractor reviews.
+
+    - ``frec_positif_vs_posneg``: positive count / (positive + negative count)
+    - ``frec_positif_vs_totpos``: share (in %) of the positive topic mentions
+    (and the same for negative). Rows are sorted by label, like the outer merge
+    the tab used to do.
+    """
+    positive = np.asarray(positive, dtype=np.int64)
+    negative = np.asarray(negative, dtype=np.int64)
+    both = positive + negative
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats = pd.DataFrame({
+            "labels": list(labels),
+            "count_positif": positive,
+            "count_negatif": negative,
+            "frec_positif_vs_posneg": positive / both,
+            "frec_negatif_vs_posneg": negative / both,
+            "frec_positif_vs_totpos": positive / positive.sum() * 100,
+            "frec_negatif_vs_totneg": negative / negative.sum() * 100,
+        })
+    return stats.sort_values("labels", kind="stable").reset_index(drop=True)
+
+
+def topic_ratios(hits, codes, labels):
+    """Ratios table from a boolean hit matrix and the sentiment codes of its rows."""
+    codes = np.asarray(codes)
+    sides = np.stack([codes == PROMOTER, codes == DETRACTOR]).astype(np.float32)
+    # one product gives the hit counts of both sides (exact for counts below 2**24)
+    positive, negative = (sides @ hits.astype(np.float32)).astype(np.int64)
+    return ratios_from_counts(positive, negative, labels)
@@ -0,0 +1 @@
+"""Offline scoring jobs that produce the dashboard dataset (replacing the notebook loops)."""
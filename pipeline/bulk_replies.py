@@ -0,0 +1,162 @@
+"""Bulk pre-generation of draft replies into the reply cache.
+
+The support team wants a draft ready for every negative review instead of one
+generated per "Generate an answer" click. This job selects reviews (by
+sentiment, store and date), skips those already in the reply cache and sends
+the others through the dashboard's ``template | model | parser`` chain with
+``ainvoke``:
+
+- at most ``concurrency`` requests in flight (``asyncio.Semaphore``);
+- a token bucket limiting the request rate (``rate`` per second, bursts of
+  ``burst``);
+- retries with exponential backoff and jitter on failures;
+- replies saved to the cache every ``checkpoint_every`` reviews, so an
+  interrupted run resumes where it stopped.
+
+Replies are stored under the prompt and model name the dashboard uses, which
+then shows them without a click. ``--model`` picks a backend of
+``dashboard.llm_provider``; ``--model local`` runs the job offline with
+``LocalEchoChatModel``.
+
+Usage::
+
+    python -m pipeline.bulk_replies data/data_avec_labels.parquet --sentiment negative --concurrency 8 --rate 4
+    python -m pipeline.bulk_replies data/data_avec_labels.parquet --model local --limit 100
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard.nps import CODE_COLUMN, SENTIMENT_CODES
+from dashboard.llm_provider import BACKENDS, LLMProvider
+from dashboard.reply_cache import REPLIES_PATH, ReplyCache
+from dashboard.review_store import load_reviews, read_reviews_csv
+
+SELECT_COLUMNS = ["review", CODE_COLUMN, "pred_sentiment", "store_address", "review_date"]
+
+
+class TokenBucket:
+    """Asyncio token bucket: ``rate`` tokens per second, at most ``burst`` stored."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def select_reviews(df, sentiment=None, store=None, start_date=None, end_date=None):
+    """Distinct non-empty review texts matching the filters (in dataset order)."""
+    mask = df["review"].notna()
+    if sentiment is not None:
+        mask &= df[CODE_COLUMN] == SENTIMENT_CODES[sentiment]
+    if store is not None:
+        mask &= df["store_address"] == store
+    if start_date is not None:
+        mask &= df["review_date"] >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= df["review_date"] <= pd.Timestamp(end_date)
+    texts = df.loc[mask, "review"].astype(str).str.replace("\n", " ", regex=False)
+    return texts[texts.str.strip() != ""].drop_duplicates().tolist()
+
+
+async def generate_with_retries(chain, text, semaphore, bucket, retries=4, backoff=1.0):
+    """One reply, retried with exponential backoff (None when every attempt failed)."""
+    for attempt in range(retries + 1):
+        async with semaphore:
+            if bucket is not None:
+                await bucket.acquire()
+            try:
+                return await chain.ainvoke({"text": text})
+            except Exception as e:
+                if attempt == retries:
+                    print(f"Error on review: {e}")
+                    return None
+        await asyncio.sleep(backoff * 2 ** attempt * (0.5 + random.random()))
+
+
+async def generate_replies(texts, chain, cache, sys_prompt, model_name, concurrency=4, rate=None, burst=None,
+                           retries=4, backoff=1.0, checkpoint_every=64):
+    """Generate and store the replies of ``texts`` missing from the cache.
+
+    Returns (generated, failed) counts.
+    """
+    cached = cache.lookup(texts, sys_prompt, model_name, count=False)
+    pending = [text for text in texts if text not in cached]
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket(rate, burst or concurrency) if rate else None
+
+    generated = failed = 0
+    for start in range(0, len(pending), checkpoint_every):
+        chunk = pending[start:start + checkpoint_every]
+        replies = await asyncio.gather(*(
+            generate_with_retries(chain, text, semaphore, bucket, retries, backoff) for text in chunk
+        ))
+        done = {text: reply for text, reply in zip(chunk, replies) if reply is not None}
+        cache.put_many(done, sys_prompt, model_name)  # checkpoint
+        generated += len(done)
+        failed += len(chunk) - len(done)
+        print(f"{start + len(chunk):,}/{len(pending):,} reviews processed")
+    return generated, failed
+
+
+def load_selection(path):
+    """Reviews of a Parquet store, a shared Arrow file or the labelled CSV."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return load_reviews(path, columns=SELECT_COLUMNS)
+    if path.suffix == ".arrow":
+        from dashboard.shared_dataset import open_shared
+
+        return open_shared(path, columns=SELECT_COLUMNS)
+    return read_reviews_csv(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate draft replies into the reply cache.")
+    parser.add_argument("dataset", type=Path, help="Parquet store, shared Arrow file or labelled CSV")
+    parser.add_argument("--sentiment", choices=sorted(SENTIMENT_CODES), default="negative")
+    parser.add_argument("--store", help="store_address to restrict to")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--model", choices=[name for name, backend in BACKENDS.items() if backend.factory],
+                        default="mistral")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=None, help="max requests per second")
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--checkpoint-every", type=int, default=64)
+    parser.add_argument("--cache", type=Path, default=REPLIES_PATH)
+    args = parser.parse_args()
+
+    reviews = select_reviews(load_selection(args.dataset), args.sentiment, args.store, args.start_date, args.end_date)
+    reviews = reviews[:args.limit] if args.limit else reviews
+    provider = LLMProvider(args.model)
+    name = provider.model_name
+
+    reply_cache = ReplyCache(args.cache)
+    started = time.perf_counter()
+    new, errors = asyncio.run(generate_replies(
+        reviews, provider.chain, reply_cache, provider.sys_prompt, name, concurrency=args.concurrency,
+        rate=args.rate, retries=args.retries, checkpoint_every=args.checkpoint_every,
+    ))
+    reply_cache.close()
+    print(f"{name}: {new:,} replies generated, {errors:,} failed, {len(reviews) - new - errors:,} already cached "
+          f"({time.perf_counter() - started:.1f}s)")
@@ -0,0 +1,218 @@
+"""Persistent, content-hash keyed cache of review embeddings.
+
+``notebooks/embeding.ipynb`` called ``model.encode`` once per review and
+stored the vectors as stringified lists in ``data_avec_labels.csv``. Here
+texts are encoded in large batches and each vector is stored once, keyed by
+the hash of its text (``pipeline.result_store.content_hash``), in an
+append-only directory per model:
+
+- ``vectors.bin``: raw float16 (or float32) rows, memory-mapped on read;
+- ``hashes.bin``: the 40-byte hash of each row;
+- ``meta.json``: model, dimension, dtype and the committed row count, replaced
+  atomically after each append (rows past it are dropped on the next open).
+
+Re-runs and topic re-scoring (``pipeline.topic_scoring``) only encode texts
+the store has never seen, and the dashboard data no longer carries embedding
+text.
+
+Usage::
+
+    python -m pipeline.embedding_store "data/data_avec_labels.csv"
+    python -m pipeline.embedding_store "data/data_avec_labels.csv" --import-column
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.result_store import content_hash
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_COLUMN = "review_embedded"
+EMBEDDINGS_DIR = Path("data/embeddings")
+
+_HASH_DTYPE = np.dtype("S40")
+
+
+def parse_embeddings(values):
+    """Stack stringified vectors (``"[0.1, 0.2]"`` or numpy's ``"[0.1 0.2]"``) into a float32 matrix."""
+    values = list(values)
+    if not values:
+        return np.empty((0, 0), dtype=np.float32)
+    dim = len(values[0].strip("[] \n").replace(",", " ").split())
+    text = " ".join(values).replace("[", " ").replace("]", " ").replace(",", " ")
+    matrix = np.array(text.split(), dtype=np.float32)
+    if matrix.size != dim * len(values):
+        raise ValueError(f"embeddings do not all have {dim} dimensions")
+    return matrix.reshape(len(values), dim)
+
+
+def store_directory(model_name=EMBEDDING_MODEL, root=EMBEDDINGS_DIR):
+    """Directory of the store of ``model_name`` (one per model)."""
+    return Path(root) / model_name.replace("/", "__")
+
+
+def load_encoder(model_name=EMBEDDING_MODEL, batch_size=256, device=None):
+    """Batch encode function of a sentence-transformers model."""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device=device)
+
+    def encode(texts):
+        return model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+
+    return encode
+
+
+class EmbeddingStore:
+    """Append-only embedding matrix keyed by content hash."""
+
+    def __init__(self, directory, model_name=EMBEDDING_MODEL, dtype="float16"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.meta_path = self.directory / "meta.json"
+        self.vectors_path = self.directory / "vectors.bin"
+        self.hashes_path = self.directory / "hashes.bin"
+
+        if self.meta_path.exists():
+            self.meta = json.loads(self.meta_path.read_text())
+            if self.meta["model"] != model_name:
+                raise ValueError(f"{self.directory} holds {self.meta['model']} embeddings, not {model_name}")
+        else:
+            self.meta = {"model": model_name, "dim": None, "dtype": np.dtype(dtype).name, "count": 0}
+        self.dtype = np.dtype(self.meta["dtype"])
+
+        # drop rows appended after the last committed count
+        for path, row_bytes in ((self.vectors_path, self._row_bytes()), (self.hashes_path, _HASH_DTYPE.itemsize)):
+            if path.exists() and path.stat().st_size > self.count * row_bytes:
+                os.truncate(path, self.count * row_bytes)
+
+        hashes = np.fromfile(self.hashes_path, dtype=_HASH_DTYPE, count=self.count) if self.count else []
+        self.rows = {key.decode(): row for row, key in enumerate(hashes)}
+        self._vectors = None
+
+    @property
+    def count(self):
+        return self.meta["count"]
+
+    @property
+    def dim(self):
+        return self.meta["dim"]
+
+    def _row_bytes(self):
+        return (self.dim or 0) * self.dtype.itemsize
+
+    @property
+    def vectors(self):
+        """Memory-mapped (count × dim) matrix of the stored vectors."""
+        if self._vectors is None:
+            if not self.count:
+                return np.empty((0, self.dim or 0), dtype=self.dtype)
+            self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(self.count, self.dim))
+        return self._vectors
+
+    def lookup(self, hashes):
+        """Row of each hash in the store (-1 when missing)."""
+        return np.fromiter((self.rows.get(key, -1) for key in hashes), dtype=np.int64, count=len(hashes))
+
+    def add(self, hashes, vectors):
+        """Append the vectors of new hashes and commit the new count."""
+        vectors = np.asarray(vectors)
+        first = {}
+        for i, key in enumerate(hashes):
+            if key not in self.rows:
+                first.setdefault(key, i)
+        if not first:
+            return
+        if self.dim is None:
+            self.meta["dim"] = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+        new_hashes = list(first)
+        rows = vectors[list(first.values())].astype(self.dtype)
+        with open(self.vectors_path, "ab") as vector_file, open(self.hashes_path, "ab") as hash_file:
+            vector_file.write(np.ascontiguousarray(rows).tobytes())
+            hash_file.write(np.array(new_hashes, dtype=_HASH_DTYPE).tobytes())
+            for handle in (vector_file, hash_file):
+                handle.flush()
+                os.fsync(handle.fileno())
+
+        for key in new_hashes:
+            self.rows[key] = len(self.rows)
+        self.meta["count"] = len(self.rows)
+        tmp_path = self.meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.meta))
+        os.replace(tmp_path, self.meta_path)
+        self._vectors = None
+
+
+def embed_texts(texts, store, encode=None, chunk_size=4096):
+    """float32 embeddings of ``texts`` (missing texts as ""), encoding only texts not in the store.
+
+    ``encode`` is only needed when some texts are missing; new vectors are
+    committed every ``chunk_size`` texts, so an interrupted run resumes.
+    """
+    texts = pd.Series(texts).fillna("").astype(str)
+    hashes = texts.map(content_hash).tolist()
+    rows = store.lookup(hashes)
+
+    missing = list(dict.fromkeys(key for key, row in zip(hashes, rows) if row < 0))
+    if missing:
+        if encode is None:
+            raise KeyError(f"{len(missing):,} texts are not in {store.directory}")
+        text_of = dict(zip(hashes, texts))
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            store.add(chunk, encode([text_of[key] for key in chunk]))
+        rows = store.lookup(hashes)
+
+    return np.asarray(store.vectors[rows], dtype=np.float32)
+
+
+def cached_embeddings(texts, store, batch_size=256):
+    """``embed_texts`` that only loads the encoder when some texts were never encoded."""
+    try:
+        return embed_texts(texts, store)
+    except KeyError:
+        return embed_texts(texts, store, load_encoder(store.meta["model"], batch_size))
+
+
+def import_column(df, store, text_column="clean_reviews", embedding_column=EMBEDDING_COLUMN):
+    """Move stringified ``review_embedded`` vectors of a DataFrame into the store."""
+    texts = df[text_column].fillna("").astype(str)
+    hashes = texts.map(content_hash).tolist()
+    new = store.lookup(hashes) < 0
+    if new.any():
+        store.add([key for key, is_new in zip(hashes, new) if is_new],
+                  parse_embeddings(df.loc[new, embedding_column]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed the reviews into the persistent embedding cache.")
+    parser.add_argument("input_csv", type=Path)
+    parser.add_argument("--root", type=Path, default=EMBEDDINGS_DIR)
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--text-column", default="clean_reviews")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--dtype", choices=["float16", "float32"], default="float16")
+    parser.add_argument("--import-column", action="store_true",
+                        help=f"import the {EMBEDDING_COLUMN} column, then rewrite the CSV without it")
+    args = parser.parse_args()
+
+    embedding_store = EmbeddingStore(store_directory(args.model, args.root), args.model, args.dtype)
+    data = pd.read_csv(args.input_csv)
+    data.columns = data.columns.str.strip()
+    before = embedding_store.count
+    if args.import_column:
+        if EMBEDDING_COLUMN in data.columns:
+            import_column(data, embedding_store, args.text_column)
+            data.drop(columns=[EMBEDDING_COLUMN]).to_csv(args.input_csv, index=False)
+            print(f"Removed {EMBEDDING_COLUMN} from {args.input_csv}")
+    else:
+        cached_embeddings(data[args.text_column], embedding_store, args.batch_size)
+    print(f"Stored {embedding_store.count - before:,} new vectors ({embedding_store.count:,} in {embedding_store.directory})")
@@ -0,0 +1,110 @@
+"""Incremental re-scoring: only run a model on reviews it has not scored yet.
+
+Texts are hashed (``pipeline.result_store.content_hash``) and looked up in the
+result store for the model id/version. Only unseen texts are scored, in chunks
+that are saved as they complete (an interrupted run resumes where it stopped),
+and the results are merged back into the dashboard dataset. A daily refresh
+costs in proportion to the new reviews instead of the full history.
+
+Usage::
+
+    python -m pipeline.incremental data/data_avec_labels.parquet --model roberta --backend onnx-int8
+"""
+
+import argparse
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from dashboard.nps import CODE_COLUMN, with_sentiment_codes
+from dashboard.review_store import to_table
+from pipeline.result_store import RESULTS_PATH, ResultStore, content_hash
+from pipeline.zero_shot_job import zero_shot_model
+
+
+def score_incremental(texts, score_batch, model_id, model_version, store, chunk_size=1024):
+    """Score ``texts`` with ``score_batch``, reusing stored results.
+
+    ``score_batch`` takes a list of texts and returns one payload dict per
+    text (None, or an empty dict, when the text could not be scored). Failed
+    texts are not saved, so the next run retries them, and their rows stay
+    unscored (NaN). Returns a DataFrame of payload columns aligned on
+    ``texts.index``, and the number of texts that had to be scored.
+    """
+    hashes = texts.map(content_hash)
+    results = store.lookup(hashes.unique(), model_id, model_version)
+
+    missing = hashes[~hashes.isin(list(results))].drop_duplicates()
+    for start in range(0, len(missing), chunk_size):
+        chunk = missing.iloc[start:start + chunk_size]
+        payloads = dict(zip(chunk.tolist(), score_batch(texts.loc[chunk.index].tolist())))
+        payloads = {key: payload for key, payload in payloads.items() if payload}
+        store.save(payloads, model_id, model_version)  # checkpoint every chunk
+        results.update(payloads)
+
+    scored = pd.DataFrame([results.get(key, {}) for key in hashes], index=texts.index)
+    return scored, len(missing)
+
+
+def merge_results(df, scored):
+    """Write the scored columns into the dataset (and refresh the NPS code column).
+
+    Only the rows with a result are written: rows without text or whose
+    scoring failed keep their current values.
+    """
+    df = df.copy()
+    rows = scored.dropna(how="all").index
+    for column in scored.columns:
+        df.loc[rows, column] = scored.loc[rows, column]
+    if "pred_sentiment" in scored.columns:
+        df = with_sentiment_codes(df.drop(columns=[CODE_COLUMN], errors="ignore"))
+    return df
+
+
+# ============================== MODELS ==============================
+
+def roberta_model(backend="torch", batch_size=32, num_threads=None):
+    """(model_id, model_version, score_batch) for the local RoBERTa sentiment model."""
+    from pipeline.roberta_batch import MODEL_DIR, RobertaScorer
+
+    scorer = RobertaScorer(MODEL_DIR, batch_size=batch_size, num_threads=num_threads, backend=backend)
+    config_hash = hashlib.sha1((MODEL_DIR / "config.json").read_bytes()).hexdigest()[:12]
+
+    def score_batch(texts):
+        labels, scores = scorer.score(texts)
+        return [{"pred_sentiment": label, "RoBERTa_score": float(score)} for label, score in zip(labels, scores)]
+
+    return "roberta_sentiment", f"{config_hash}-{backend}", score_batch
+
+
+MODELS = {
+    "roberta": roberta_model,
+    "bart": zero_shot_model,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score only new or changed reviews and update the store.")
+    parser.add_argument("dataset", type=Path, help="Parquet review store (see dashboard.review_store)")
+    parser.add_argument("--model", choices=sorted(MODELS), default="roberta")
+    parser.add_argument("--results", type=Path, default=RESULTS_PATH)
+    parser.add_argument("--text-column", default="clean_reviews")
+    parser.add_argument("--backend", default="torch", help="RoBERTa backend (torch, onnx, onnx-int8)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    data = pq.read_table(args.dataset).to_pandas()
+    texts = data[args.text_column].dropna()
+    model_id, model_version, score_batch = MODELS[args.model](backend=args.backend, batch_size=args.batch_size, num_threads=args.threads)
+
+    store = ResultStore(args.results)
+    scored, new = score_incremental(texts, score_batch, model_id, model_version, store)
+    store.close()
+
+    pq.write_table(to_table(merge_results(data, scored)), args.dataset, compression="zstd")
+    unscored = int(scored.isna().all(axis=1).sum())
+    print(f"{model_id} {model_version}: scored {new:,} new texts, reused {len(texts) - new:,} results, "
+          f"{unscored:,} reviews left unscored (retried next run)")
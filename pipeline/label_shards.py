@@ -0,0 +1,206 @@
+"""Fast loader for the zero-shot label shards in ``Classifided_reviews/``.
+
+The shards (``classified_reviews_<start>_to_<end>.json``) are pretty-printed
+JSON arrays of ``{review, labels: [{label, score}]}``. Instead of
+``json.load``-ing them into per-review dicts and pivoting by hand, this module
+splits the raw bytes on the ``"review"`` keys with regular expressions and
+scatters every (label, score) pair straight into a dense float32
+(reviews × labels) matrix.
+The JSONL sink written by ``pipeline.zero_shot_job`` uses the same keys and is
+read the same way.
+
+Shards are discovered by the offset range in their name; gaps, overlaps and
+entry counts that do not match the declared range are reported. The merged
+matrix can be written once to a compact Parquet file and joined to the main
+dataset on the review text, which is the only join key: the JSON shards hold
+more entries than their names declare (3170 in ``1114_to_4225``), so their
+positions are not dataset offsets and their ``offset`` is ``MISSING_OFFSET``.
+Only JSONL entries carry the offset they were classified at.
+
+Usage::
+
+    python -m pipeline.label_shards Classifided_reviews --output Classifided_reviews/classified_reviews.parquet
+"""
+
+import argparse
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pipeline.zero_shot_job import CANDIDATE_LABELS
+
+SHARD_PATTERN = re.compile(r"classified_reviews_(\d+)_to_(\d+)\.json$")
+
+_STRING = rb'"([^"\\]*(?:\\.[^"\\]*)*)"'
+_REVIEW = re.compile(rb'"review"\s*:\s*' + _STRING)
+_LABEL = re.compile(rb'"label"\s*:\s*' + _STRING)
+_SCORE = re.compile(rb'"score"\s*:\s*(-?[0-9.eE+-]+)')
+_OFFSET = re.compile(rb'"offset"\s*:\s*(\d+)')
+
+COLUMN_PREFIX = "bart_"
+# offset of the entries of JSON shards, which do not record it
+MISSING_OFFSET = -1
+
+
+@dataclass
+class Shard:
+    path: Path
+    start: int
+    end: int  # inclusive, as in the file names
+
+    @property
+    def declared_size(self):
+        return self.end - self.start + 1
+
+
+@dataclass
+class LabelMatrix:
+    """Zero-shot scores: one row per classified review, one column per label."""
+
+    reviews: np.ndarray
+    offsets: np.ndarray
+    scores: np.ndarray
+    labels: list
+
+    def to_frame(self):
+        frame = pd.DataFrame(self.scores, columns=[COLUMN_PREFIX + label for label in self.labels])
+        frame.insert(0, "review", self.reviews)
+        frame.insert(0, "offset", self.offsets)
+        return frame
+
+
+def discover_shards(directory):
+    """Shards of ``directory`` ordered by their starting offset."""
+    shards = []
+    for path in Path(directory).glob("classified_reviews_*_to_*.json"):
+        match = SHARD_PATTERN.search(path.name)
+        if match:
+            shards.append(Shard(path, int(match.group(1)), int(match.group(2))))
+    return sorted(shards, key=lambda shard: shard.start)
+
+
+def validate_ranges(shards):
+    """Gaps and overlaps between consecutive shard ranges."""
+    issues = []
+    for previous, shard in zip(shards, shards[1:]):
+        if shard.start > previous.end + 1:
+            issues.append(f"gap: offsets {previous.end + 1}-{shard.start - 1} missing between {previous.path.name} and {shard.path.name}")
+        elif shard.start <= previous.end:
+            issues.append(f"overlap: offsets {shard.start}-{min(shard.end, previous.end)} in {previous.path.name} and {shard.path.name}")
+    return issues
+
+
+def _decode(raw):
+    if b"\\" in raw:
+        return json.loads(b'"' + raw + b'"')
+    return raw.decode("utf-8")
+
+
+def scan(path, label_index):
+    """Scan one shard (JSON array or JSONL) without building per-review objects.
+
+    ``label_index`` maps label -> column and is extended with unknown labels.
+    Returns (reviews, offsets, rows, columns, scores) where the last three are
+    the coordinates of every (label, score) pair; offsets are
+    ``MISSING_OFFSET`` when the shard does not record them.
+    """
+    data = Path(path).read_bytes()
+    # [before, review_1, labels_1, review_2, labels_2, ...]
+    segments = _REVIEW.split(data)
+    reviews = [_decode(raw) for raw in segments[1::2]]
+    label_blocks = segments[2::2]
+
+    counts = np.fromiter((block.count(b'"label"') for block in label_blocks), dtype=np.int64, count=len(label_blocks))
+    rows = np.repeat(np.arange(len(reviews)), counts)
+    label_bytes = _LABEL.findall(b"".join(label_blocks))
+    scores = np.array(_SCORE.findall(b"".join(label_blocks)), dtype=bytes).astype(np.float32)
+
+    names, inverse = np.unique(np.array(label_bytes, dtype=bytes), return_inverse=True)
+    name_columns = np.array([label_index.setdefault(_decode(name), len(label_index)) for name in names], dtype=np.int64)
+    columns = name_columns[inverse] if len(names) else np.empty(0, dtype=np.int64)
+
+    offsets = [int(offset) for offset in _OFFSET.findall(data)]
+    if len(offsets) != len(reviews):  # JSON shards: not recorded
+        offsets = [MISSING_OFFSET] * len(reviews)
+    return reviews, np.asarray(offsets, dtype=np.int64), rows, columns, scores
+
+
+def load_label_matrix(paths_or_directory, labels=CANDIDATE_LABELS):
+    """Merge shards into a dense float32 matrix. Returns (LabelMatrix, validation issues)."""
+    if isinstance(paths_or_directory, (str, Path)) and Path(paths_or_directory).is_dir():
+        shards = discover_shards(paths_or_directory)
+        issues = validate_ranges(shards)
+        sources = [(shard.path, shard) for shard in shards]
+    else:
+        issues = []
+        sources = [(Path(path), None) for path in paths_or_directory]
+
+    label_index = {label: i for i, label in enumerate(labels)}
+    all_reviews, all_offsets, parts, n_rows = [], [], [], 0
+    for path, shard in sources:
+        reviews, offsets, rows, columns, scores = scan(path, label_index)
+        if shard is not None and len(reviews) != shard.declared_size:
+            issues.append(f"count: {path.name} declares {shard.declared_size} reviews but holds {len(reviews)}")
+        all_reviews.extend(reviews)
+        all_offsets.append(offsets)
+        parts.append((rows + n_rows, columns, scores))
+        n_rows += len(reviews)
+
+    matrix = np.full((n_rows, len(label_index)), np.nan, dtype=np.float32)
+    for rows, columns, scores in parts:
+        matrix[rows, columns] = scores
+
+    label_names = sorted(label_index, key=label_index.get)
+    offsets = np.concatenate(all_offsets) if all_offsets else np.empty(0, dtype=np.int64)
+    return LabelMatrix(np.array(all_reviews, dtype=object), offsets, matrix, label_names), issues
+
+
+def write_compact(label_matrix, path):
+    """Write the merged matrix once as Parquet (offset, review, one float32 column per label).
+
+    Join it on ``review`` (see ``join_labels``), not on ``offset``.
+    """
+    pq.write_table(pa.Table.from_pandas(label_matrix.to_frame(), preserve_index=False), path, compression="zstd")
+
+
+def read_compact(path):
+    """Read a matrix written by ``write_compact``."""
+    frame = pq.read_table(path).to_pandas()
+    label_columns = [column for column in frame.columns if column.startswith(COLUMN_PREFIX)]
+    return LabelMatrix(
+        frame["review"].to_numpy(dtype=object),
+        frame["offset"].to_numpy(),
+        frame[label_columns].to_numpy(dtype=np.float32),
+        [column[len(COLUMN_PREFIX):] for column in label_columns],
+    )
+
+
+def join_labels(df, label_matrix, text_column="clean_reviews"):
+    """Zero-shot label columns aligned on ``df`` by review text (NaN where not classified)."""
+    reviews = pd.Index(label_matrix.reviews)
+    first = ~reviews.duplicated()
+    positions = reviews[first].get_indexer(df[text_column])
+    scores = label_matrix.scores[first][np.maximum(positions, 0)]
+    scores[positions < 0] = np.nan
+    return pd.DataFrame(scores, index=df.index, columns=[COLUMN_PREFIX + label for label in label_matrix.labels])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate and merge the zero-shot label shards.")
+    parser.add_argument("directory", type=Path, nargs="?", default=Path("Classifided_reviews"))
+    parser.add_argument("--output", type=Path, help="compact Parquet file to write")
+    args = parser.parse_args()
+
+    label_matrix, problems = load_label_matrix(args.directory)
+    for problem in problems:
+        print(f"WARNING {problem}")
+    print(f"{label_matrix.scores.shape[0]:,} reviews × {label_matrix.scores.shape[1]} labels")
+    if args.output:
+        write_compact(label_matrix, args.output)
+        print(f"Wrote {args.output}")
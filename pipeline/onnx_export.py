@@ -0,0 +1,134 @@
+"""ONNX export, int8 quantization and backend report for the RoBERTa model.
+
+The 12-layer RoBERTa is the dominant cost of the scoring pipeline on our
+CPU-only machines. This module exports it to an ONNX graph (dynamic batch and
+sequence axes), derives a dynamically int8-quantized copy, and compares the
+backends of ``pipeline.roberta_batch`` on labelled reviews: accuracy against
+``actual_sentiment`` (computed as in ``model_roberta.ipynb``) and reviews/sec.
+The fastest backend whose accuracy stays within the tolerance of the torch
+model is recommended.
+
+Usage::
+
+    python -m pipeline.onnx_export export
+    python -m pipeline.onnx_export report cleaned_data.csv --sample 1000 --tolerance 0.01
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.roberta_batch import BACKENDS, MODEL_DIR, ONNX_FILES, RobertaScorer
+
+
+def export_onnx(model_dir=MODEL_DIR, opset=14):
+    """Export the model to ``model.onnx`` in ``model_dir``."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    model_dir = Path(model_dir)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir).eval()
+    model.config.return_dict = False
+
+    sample = tokenizer(["the fries were cold", "great staff"], padding=True, return_tensors="pt")
+    onnx_path = model_dir / ONNX_FILES["onnx"]
+    # no_grad, not inference_mode: tracing must be able to record the graph
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(onnx_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=opset,
+        )
+    return onnx_path
+
+
+def quantize_int8(model_dir=MODEL_DIR):
+    """Write ``model.int8.onnx``: dynamic int8 quantization of the exported graph."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model_dir = Path(model_dir)
+    int8_path = model_dir / ONNX_FILES["onnx-int8"]
+    quantize_dynamic(str(model_dir / ONNX_FILES["onnx"]), str(int8_path), weight_type=QuantType.QInt8)
+    return int8_path
+
+
+def calculate_accuracy(predicted_labels, actual_labels):
+    """Share of predictions equal to the label, ignoring missing predictions (as in the notebook)."""
+    correct = 0
+    total = 0
+    for pred, actual in zip(predicted_labels, actual_labels):
+        if pred is not None:
+            total += 1
+            if pred.lower() == actual.lower():
+                correct += 1
+    return correct / total if total > 0 else 0.0
+
+
+def backend_report(df, backends=BACKENDS, model_dir=MODEL_DIR, batch_size=32, num_threads=None,
+                   tolerance=0.01, text_column="clean_reviews", scorer=RobertaScorer):
+    """Accuracy and throughput of each backend on labelled reviews.
+
+    ``accuracy_drop`` is measured against the first backend (torch by default);
+    ``within_tolerance`` flags backends whose drop is at most ``tolerance``.
+    ``scorer`` builds the scorer of a backend (``RobertaScorer`` arguments).
+    """
+    labelled = df.dropna(subset=[text_column, "actual_sentiment"])
+    texts = labelled[text_column].tolist()
+
+    rows = []
+    for backend in backends:
+        backend_scorer = scorer(model_dir, batch_size=batch_size, num_threads=num_threads, backend=backend)
+        started = time.perf_counter()
+        labels, _ = backend_scorer.score(texts)
+        elapsed = time.perf_counter() - started
+        rows.append({
+            "backend": backend,
+            "accuracy": calculate_accuracy(labels, labelled["actual_sentiment"]),
+            "reviews_per_sec": len(texts) / elapsed if elapsed else float("nan"),
+        })
+
+    report = pd.DataFrame(rows)
+    report["accuracy_drop"] = report["accuracy"].iloc[0] - report["accuracy"]
+    report["within_tolerance"] = report["accuracy_drop"] <= tolerance
+    return report.sort_values("reviews_per_sec", ascending=False).reset_index(drop=True)
+
+
+def recommended_backend(report):
+    """Fastest backend that stays within the accuracy tolerance."""
+    return report[report["within_tolerance"]].iloc[0]["backend"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export/quantize the RoBERTa model and compare backends.")
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("export", help="write model.onnx and model.int8.onnx")
+    report_parser = commands.add_parser("report", help="accuracy vs throughput of each backend")
+    report_parser.add_argument("input_csv", type=Path, help="reviews with an actual_sentiment column")
+    report_parser.add_argument("--sample", type=int, default=1000)
+    report_parser.add_argument("--batch-size", type=int, default=32)
+    report_parser.add_argument("--threads", type=int, default=None)
+    report_parser.add_argument("--tolerance", type=float, default=0.01, help="max accuracy drop vs torch")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(f"Exported {export_onnx(args.model_dir)}")
+        print(f"Quantized {quantize_int8(args.model_dir)}")
+    else:
+        data = pd.read_csv(args.input_csv).dropna(subset=["clean_reviews", "actual_sentiment"])
+        data = data.sample(min(args.sample, len(data)), random_state=0)
+        report = backend_report(data, model_dir=args.model_dir, batch_size=args.batch_size,
+                                num_threads=args.threads, tolerance=args.tolerance)
+        print(report.to_string(index=False))
+        print(f"Recommended backend: {recommended_backend(report)}")
@@ -0,0 +1,80 @@
+"""Content-hash keyed store of model outputs.
+
+Each result is keyed by the hash of the review text (``clean_reviews``) and by
+the model id and version that produced it, so a pipeline run only has to score
+texts the store has never seen with that model. Results are kept in a small
+SQLite database as JSON payloads (one row per text and model).
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+RESULTS_PATH = Path("data/model_results.sqlite")
+
+# SQLite limits the number of bound parameters per statement
+_CHUNK = 500
+
+
+def content_hash(text):
+    """Stable hash of a review text (missing texts hash like the empty string)."""
+    if text is None or text != text:  # None or NaN
+        text = ""
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """Model outputs keyed by (content hash, model id, model version)."""
+
+    def __init__(self, path=RESULTS_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                content_hash TEXT NOT NULL,
+                model_id TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (content_hash, model_id, model_version)
+            )
+            """
+        )
+        self.connection.commit()
+
+    def lookup(self, hashes, model_id, model_version):
+        """Return {hash: payload} for the hashes already scored by this model."""
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+        for start in range(0, len(hashes), _CHUNK):
+            chunk = hashes[start:start + _CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT content_hash, payload FROM results "
+                f"WHERE model_id = ? AND model_version = ? AND content_hash IN ({placeholders})",
+                [model_id, model_version, *chunk],
+            )
+            found.update((key, json.loads(payload)) for key, payload in rows)
+        return found
+
+    def save(self, payloads, model_id, model_version):
+        """Insert or replace {hash: payload} results of a model."""
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+            [(key, model_id, model_version, json.dumps(payload), now) for key, payload in payloads.items()],
+        )
+        self.connection.commit()
+
+    def count(self, model_id=None):
+        """Number of stored results (optionally for one model)."""
+        if model_id is None:
+            return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return self.connection.execute("SELECT COUNT(*) FROM results WHERE model_id = ?", [model_id]).fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,174 @@
+"""Batched CPU inference for the RoBERTa sentiment model.
+
+``notebooks/model_roberta.ipynb`` scores reviews one at a time through
+``pipeline("sentiment-analysis")`` inside an ``iterrows`` loop. This module
+loads the model saved in ``models/roberta_sentiment`` and scores whole lists of
+reviews instead:
+
+- texts are tokenized once, then grouped into batches of similar length
+  (sorted by token count) and padded per batch, so little compute is spent on
+  padding tokens;
+- batches run under ``torch.inference_mode`` with a configurable number of
+  intra-op threads, or through ONNX Runtime (``backend="onnx"`` or the int8
+  quantized ``"onnx-int8"``, exported by ``pipeline.onnx_export``);
+- results are the ``pred_sentiment`` / ``RoBERTa_score`` columns used by the
+  dashboard (label and probability of the top class, as returned by the
+  pipeline).
+
+Score a CSV::
+
+    python -m pipeline.roberta_batch cleaned_data.csv model_roberta_results.csv --batch-size 64 --threads 8 --backend onnx-int8
+
+Compare throughput with the per-row pipeline loop::
+
+    python -m pipeline.roberta_batch cleaned_data.csv --benchmark 500
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MODEL_DIR = Path("models/roberta_sentiment")
+
+# ONNX graphs written by pipeline.onnx_export, relative to the model directory
+ONNX_FILES = {"onnx": "model.onnx", "onnx-int8": "model.int8.onnx"}
+BACKENDS = ["torch"] + list(ONNX_FILES)
+
+
+def length_sorted_batches(lengths, batch_size):
+    """Split indices into batches of similar length (longest first)."""
+    order = np.argsort(-np.asarray(lengths), kind="stable")
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+class RobertaScorer:
+    """Score review texts with the local RoBERTa sentiment model."""
+
+    def __init__(self, model_dir=MODEL_DIR, batch_size=32, num_threads=None, max_length=512, backend="torch"):
+        from transformers import AutoTokenizer
+
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+        self.model_dir = Path(model_dir)
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        config = json.loads((self.model_dir / "config.json").read_text())
+        self.id2label = {int(key): value for key, value in config["id2label"].items()}
+
+        if backend == "torch":
+            import torch
+            from transformers import AutoModelForSequenceClassification
+
+            if num_threads:
+                torch.set_num_threads(num_threads)
+            self.torch = torch
+            self.model = AutoModelForSequenceClassification.from_pretrained(self.model_dir).eval()
+        else:
+            import onnxruntime as ort
+
+            options = ort.SessionOptions()
+            if num_threads:
+                options.intra_op_num_threads = num_threads
+            onnx_path = self.model_dir / ONNX_FILES[backend]
+            self.session = ort.InferenceSession(str(onnx_path), options, providers=["CPUExecutionProvider"])
+            self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def _logits(self, batch):
+        """Logits of one padded batch, as a numpy array."""
+        if self.backend != "torch":
+            inputs = {name: np.asarray(batch[name], dtype=np.int64) for name in self.input_names}
+            return self.session.run(None, inputs)[0]
+        with self.torch.inference_mode():
+            inputs = {key: self.torch.as_tensor(value) for key, value in batch.items()}
+            return self.model(**inputs).logits.numpy()
+
+    def score(self, texts):
+        """Return (labels, scores) for a list of texts, in input order."""
+        texts = [str(text) for text in texts]
+        if not texts:
+            return np.empty(0, dtype=object), np.empty(0, dtype=np.float32)
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        input_ids = encodings["input_ids"]
+
+        labels = np.empty(len(texts), dtype=object)
+        scores = np.empty(len(texts), dtype=np.float32)
+        for batch_index in length_sorted_batches([len(ids) for ids in input_ids], self.batch_size):
+            features = [{key: encodings[key][i] for key in encodings.keys()} for i in batch_index]
+            batch = self.tokenizer.pad(features, padding="longest", return_tensors="np")
+            logits = self._logits(batch)
+            # Softmax probability of the predicted class (the pipeline's "score")
+            logits = logits - logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            predicted = probabilities.argmax(axis=1)
+            labels[batch_index] = [self.id2label[int(i)] for i in predicted]
+            scores[batch_index] = probabilities[np.arange(len(predicted)), predicted]
+        return labels, scores
+
+    def score_frame(self, df, text_column="clean_reviews"):
+        """Return a copy of ``df`` with ``pred_sentiment`` and ``RoBERTa_score`` columns.
+
+        Rows without text are left empty (the notebook dropped them).
+        """
+        df = df.copy()
+        has_text = df[text_column].notna().to_numpy()
+        labels, scores = self.score(df.loc[has_text, text_column].tolist())
+        df["pred_sentiment"] = pd.Series(labels, index=df.index[has_text], dtype=object)
+        df["RoBERTa_score"] = pd.Series(scores, index=df.index[has_text], dtype=float)
+        return df
+
+
+def per_row_baseline(texts, model_dir=MODEL_DIR):
+    """The notebook's loop: one ``pipeline("sentiment-analysis")`` call per review."""
+    from transformers import pipeline
+
+    model_roberta = pipeline("sentiment-analysis", model=str(model_dir), tokenizer=str(model_dir), truncation=True)
+    return [model_roberta(text)[0] for text in texts]
+
+
+def benchmark(texts, model_dir=MODEL_DIR, batch_size=32, num_threads=None, baseline=True, backend="torch"):
+    """Reviews per second of the batched scorer, and of the per-row loop if ``baseline``."""
+    results = {"reviews": len(texts)}
+
+    scorer = RobertaScorer(model_dir, batch_size=batch_size, num_threads=num_threads, backend=backend)
+    started = time.perf_counter()
+    scorer.score(texts)
+    results["batched_reviews_per_sec"] = len(texts) / (time.perf_counter() - started)
+
+    if baseline:
+        started = time.perf_counter()
+        per_row_baseline(texts, model_dir)
+        results["per_row_reviews_per_sec"] = len(texts) / (time.perf_counter() - started)
+        results["speedup"] = results["batched_reviews_per_sec"] / results["per_row_reviews_per_sec"]
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch sentiment scoring with the local RoBERTa model.")
+    parser.add_argument("input_csv", type=Path)
+    parser.add_argument("output_csv", type=Path, nargs="?")
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR)
+    parser.add_argument("--text-column", default="clean_reviews")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None, help="intra-op threads")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="benchmark on the first N reviews instead of scoring")
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.input_csv)
+    if args.benchmark:
+        sample = data[args.text_column].dropna().head(args.benchmark).tolist()
+        for key, value in benchmark(sample, args.model_dir, args.batch_size, args.threads, backend=args.backend).items():
+            print(f"{key}: {value:,.2f}")
+    else:
+        if args.output_csv is None:
+            parser.error("output_csv is required when not benchmarking")
+        scorer = RobertaScorer(args.model_dir, batch_size=args.batch_size, num_threads=args.threads, backend=args.backend)
+        scorer.score_frame(data, args.text_column).to_csv(args.output_csv, index=False)
+        print(f"Scored {len(data):,} reviews into {args.output_csv}")
@@ -0,0 +1,215 @@
+"""Vectorized topic scoring of the review embeddings.
+
+``notebooks/embeding.ipynb`` computed each topic column with a list
+comprehension calling ``np.dot`` and ``norm`` per (review, label) pair, and
+the top-5 labels by sorting a list of tuples per review. Here the review and
+label embedding matrices are L2-normalized once, the cosine similarities of
+all pairs come from one matrix product (in row chunks to bound memory) and the
+top-k labels from ``np.argpartition``. The output columns are the topic
+columns read by the dashboard, one per topic of ``dashboard/topics.json``
+(the best score over the label and its synonyms).
+
+Label texts are embedded through the embedding store like the reviews, so
+``rescore`` after adding or editing a topic only encodes the new texts and
+computes the new columns against the cached review vectors. The fingerprint
+of the texts behind each column is kept in the Parquet metadata.
+
+Usage::
+
+    python -m pipeline.topic_scoring score "data/data_avec_labels.csv" data/data_avec_labels.parquet
+    python -m pipeline.topic_scoring score "data/data_avec_labels.csv" --benchmark
+    python -m pipeline.topic_scoring rescore data/data_avec_labels.parquet
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from dashboard.review_store import read_reviews_csv, to_table
+from dashboard.topic_registry import REGISTRY_PATH, TopicRegistry
+from pipeline.embedding_store import (EMBEDDING_COLUMN, EmbeddingStore, cached_embeddings, parse_embeddings,
+                                      store_directory)
+
+# Reviews normalized per matrix product (bounds the temporary float32 copy of the embeddings)
+CHUNK_SIZE = 65536
+
+# Parquet metadata key holding {label: fingerprint} of the scored topic columns
+FINGERPRINTS_KEY = b"topic_fingerprints"
+
+
+def normalize_rows(matrix):
+    """L2-normalized float32 copy of ``matrix`` (zero rows give NaN, like the notebook's division)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def score_matrix(review_embeddings, label_embeddings, chunk_size=CHUNK_SIZE):
+    """Cosine similarity of every review with every label, as a (reviews × labels) float32 matrix."""
+    labels_t = normalize_rows(label_embeddings).T
+    scores = np.empty((len(review_embeddings), labels_t.shape[1]), dtype=np.float32)
+    for start in range(0, len(review_embeddings), chunk_size):
+        chunk = normalize_rows(review_embeddings[start:start + chunk_size])
+        np.matmul(chunk, labels_t, out=scores[start:start + chunk_size])
+    return scores
+
+
+def top_k_labels(scores, k=5):
+    """Column indices of the ``k`` best labels of each row, best first."""
+    k = min(k, scores.shape[1])
+    ranked = np.nan_to_num(scores, nan=-np.inf)
+    top = np.argpartition(-ranked, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(ranked, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def topic_vectors(topics, store):
+    """Embeddings of the texts of ``topics`` and the first row of each topic."""
+    texts = [text for topic in topics for text in topic.texts]
+    starts = np.cumsum([0] + [len(topic.texts) for topic in topics[:-1]])
+    return cached_embeddings(texts, store), starts
+
+
+def score_topics(review_embeddings, text_vectors, starts, chunk_size=CHUNK_SIZE):
+    """(reviews × topics) scores: best cosine over the texts of each topic."""
+    scores = score_matrix(review_embeddings, text_vectors, chunk_size)
+    if len(starts) == scores.shape[1]:  # no synonyms
+        return scores
+    return np.maximum.reduceat(scores, starts, axis=1)
+
+
+def topic_columns(scores, labels, top_k=0, index=None):
+    """Topic score columns (one per label) and optionally ``top_<i>_label`` columns."""
+    columns = pd.DataFrame(scores, columns=list(labels), index=index)
+    if top_k:
+        names = np.asarray(labels, dtype=object)[top_k_labels(scores, top_k)]
+        for i in range(names.shape[1]):
+            columns[f"top_{i + 1}_label"] = names[:, i]
+    return columns
+
+
+def stale_topics(registry, columns, scored):
+    """Topics whose column is missing or was scored from other texts.
+
+    Without recorded fingerprints (stores converted from the notebook CSV),
+    existing columns are taken as current.
+    """
+    columns = set(columns)
+    return [
+        topic for topic in registry.topics
+        if topic.label not in columns or (scored and scored.get(topic.label) != topic.fingerprint)
+    ]
+
+
+def rescore_topics(df, registry, store, text_column="clean_reviews", scored=None):
+    """Recompute only the stale topic columns of ``df``. Returns (df, re-scored labels)."""
+    topics = stale_topics(registry, df.columns, scored or {})
+    if not topics:
+        return df, []
+    reviews = cached_embeddings(df[text_column], store)
+    text_vectors, starts = topic_vectors(topics, store)
+    labels = [topic.label for topic in topics]
+    columns = topic_columns(score_topics(reviews, text_vectors, starts), labels, index=df.index)
+    df = df.copy()
+    for column in columns.columns:
+        df[column] = columns[column]
+    return df, labels
+
+
+def read_fingerprints(path):
+    """{label: fingerprint} recorded in a Parquet store ({} if none)."""
+    metadata = pq.read_schema(path).metadata or {}
+    return json.loads(metadata[FINGERPRINTS_KEY]) if FINGERPRINTS_KEY in metadata else {}
+
+
+def write_store(df, path, registry):
+    """Write the review store with the fingerprints of its topic columns."""
+    table = to_table(df)
+    fingerprints = {label: fingerprint for label, fingerprint in registry.fingerprints().items() if label in df.columns}
+    metadata = {**(table.schema.metadata or {}), FINGERPRINTS_KEY: json.dumps(fingerprints).encode()}
+    pq.write_table(table.replace_schema_metadata(metadata), path, compression="zstd")
+
+
+def loop_scores(review_embeddings, label_embeddings, labels):
+    """The notebook's per-pair loop, kept as the benchmark baseline."""
+    from numpy.linalg import norm
+
+    return pd.DataFrame({
+        label: [
+            np.dot(review, label_embeddings[i]) / (norm(review) * norm(label_embeddings[i]))
+            for review in review_embeddings
+        ]
+        for i, label in enumerate(labels)
+    })
+
+
+def benchmark(review_embeddings, label_embeddings, labels):
+    """Time the notebook loop against ``score_matrix`` + ``top_k_labels`` and check they agree."""
+    started = time.perf_counter()
+    expected = loop_scores(review_embeddings, label_embeddings, labels)
+    loop_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores = score_matrix(review_embeddings, label_embeddings)
+    top_k_labels(scores)
+    vectorized_seconds = time.perf_counter() - started
+
+    return {
+        "reviews": len(review_embeddings),
+        "loop_seconds": loop_seconds,
+        "vectorized_seconds": vectorized_seconds,
+        "speedup": loop_seconds / vectorized_seconds if vectorized_seconds else float("inf"),
+        "max_abs_diff": float(np.nanmax(np.abs(expected.to_numpy() - scores))) if len(scores) else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score the topic labels of the review embeddings.")
+    parser.add_argument("--registry", type=Path, default=REGISTRY_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    score_parser = commands.add_parser("score", help="score every topic of a labelled review CSV")
+    score_parser.add_argument("input_csv", type=Path)
+    score_parser.add_argument("output", type=Path, nargs="?", help="Parquet review store to write")
+    score_parser.add_argument("--embeddings", type=Path, help="review embeddings as .npy (instead of the embedding store)")
+    score_parser.add_argument("--top-k", type=int, default=0, help="also write top_<i>_label columns")
+    score_parser.add_argument("--benchmark", action="store_true", help="compare with the notebook loop")
+    rescore_parser = commands.add_parser("rescore", help="re-score only new or edited topics of a Parquet store")
+    rescore_parser.add_argument("store", type=Path)
+    args = parser.parse_args()
+
+    topic_registry = TopicRegistry.load(args.registry)
+    embedding_store = EmbeddingStore(store_directory())
+
+    if args.command == "rescore":
+        data = pq.read_table(args.store).to_pandas()
+        data, rescored = rescore_topics(data, topic_registry, embedding_store, scored=read_fingerprints(args.store))
+        write_store(data, args.store, topic_registry)
+        print(f"Re-scored {len(rescored)} topics: {', '.join(rescored) or '-'}")
+    else:
+        columns = [column.strip() for column in pd.read_csv(args.input_csv, nrows=0).columns]
+        if args.embeddings:
+            reviews = np.load(args.embeddings, mmap_mode="r")
+        elif EMBEDDING_COLUMN in columns:  # CSV written by the notebook
+            embedded = pd.read_csv(args.input_csv, usecols=lambda column: column.strip() == EMBEDDING_COLUMN)
+            reviews = parse_embeddings(embedded.iloc[:, 0])
+        else:  # cached vectors, encoding only the texts never seen
+            texts = pd.read_csv(args.input_csv, usecols=lambda column: column.strip() == "clean_reviews").iloc[:, 0]
+            reviews = cached_embeddings(texts, embedding_store)
+        text_vectors, text_starts = topic_vectors(topic_registry.topics, embedding_store)
+
+        if args.benchmark:
+            for key, value in benchmark(reviews, text_vectors[text_starts], topic_registry.labels).items():
+                print(f"{key}: {value:,.4g}")
+        if args.output:
+            data = read_reviews_csv(args.input_csv)
+            topics = topic_columns(score_topics(reviews, text_vectors, text_starts), topic_registry.labels,
+                                   top_k=args.top_k, index=data.index)
+            for column in topics.columns:
+                data[column] = topics[column]
+            write_store(data, args.output, topic_registry)
+            print(f"Wrote {len(data):,} reviews to {args.output}")
@@ -0,0 +1,190 @@
+"""Resumable zero-shot topic classification job (replaces ``big_loop.ipynb``).
+
+The notebook slept 0.1 s per review, rewrote the whole growing
+``classified_reviews.json`` after every review (quadratic I/O) and was resumed
+by hand-editing ``start``, which is how the ``Classifided_reviews/`` shards got
+their names. This job instead:
+
+- classifies reviews in chunks through ``facebook/bart-large-mnli``, the
+  (review, label) hypotheses of a review being batched together;
+- appends one JSON line per review (``offset``, ``review``, ``labels``) to an
+  append-only sink;
+- every ``checkpoint_every`` reviews, flushes the sink and atomically records
+  the next offset, the committed sink size and the offsets of the reviews the
+  classifier failed on;
+- on restart, truncates anything written after the last checkpoint, retries
+  the failed offsets and resumes from its offset.
+
+Usage::
+
+    python -m pipeline.zero_shot_job data/df2_model_TC.csv Classifided_reviews/classified_reviews.jsonl
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+from tqdm import tqdm
+
+MODEL_NAME = "facebook/bart-large-mnli"
+
+CANDIDATE_LABELS = [
+    'hygiene', 'food quality', 'food', 'staff', 'something is missing',
+    'location', 'speed of service', 'drive-thru', 'temperature of the food',
+    'atmosphere', 'customer service'
+]
+
+
+def load_classifier(model_name=MODEL_NAME, device=-1):
+    """The Hugging Face zero-shot pipeline (CPU by default)."""
+    from transformers import pipeline
+
+    return pipeline("zero-shot-classification", model=model_name, device=device)
+
+
+def checkpoint_path(sink_path):
+    return Path(f"{sink_path}.checkpoint.json")
+
+
+def read_checkpoint(sink_path):
+    """Last committed (next_offset, sink_bytes, failed offsets), or (0, 0, []) for a new job."""
+    path = checkpoint_path(sink_path)
+    if not path.exists():
+        return 0, 0, []
+    checkpoint = json.loads(path.read_text())
+    return checkpoint["next_offset"], checkpoint["sink_bytes"], checkpoint.get("failed", [])
+
+
+def write_checkpoint(sink_path, next_offset, sink_bytes, failed=()):
+    """Atomically record the committed offset, sink size and failed offsets."""
+    path = checkpoint_path(sink_path)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"next_offset": next_offset, "sink_bytes": sink_bytes, "failed": sorted(failed)}))
+    os.replace(tmp_path, path)
+
+
+def to_entry(offset, review, result):
+    """Sink record, in the format of the ``Classifided_reviews`` shards."""
+    return {
+        "offset": offset,
+        "review": review,
+        "labels": [
+            {"label": label, "score": float(f"{score:.4f}")}
+            for label, score in zip(result["labels"], result["scores"])
+        ],
+    }
+
+
+def classify_chunk(classifier, reviews, candidate_labels, batch_size):
+    """Classify a list of reviews; on failure retry one by one (None for reviews that still fail)."""
+    try:
+        results = classifier(reviews, candidate_labels, multi_label=True, batch_size=batch_size)
+        return results if isinstance(results, list) else [results]
+    except Exception:
+        results = []
+        for review in reviews:
+            try:
+                results.append(classifier(review, candidate_labels, multi_label=True, batch_size=batch_size))
+            except Exception as e:
+                print(f"Error on review: {e}")
+                results.append(None)
+        return results
+
+
+def classify_offsets(sink, texts, offsets, classifier, candidate_labels, batch_size):
+    """Append the entries of ``texts[offset]`` to the sink; returns the offsets the classifier failed on.
+
+    Empty and non-string reviews are skipped, not failed.
+    """
+    valid = [(offset, texts[offset]) for offset in offsets if isinstance(texts[offset], str) and texts[offset]]
+    results = classify_chunk(classifier, [review for _, review in valid], candidate_labels, batch_size) if valid else []
+    failed = []
+    for (offset, review), result in zip(valid, results):
+        if result is None:
+            failed.append(offset)
+        else:
+            line = json.dumps(to_entry(offset, review, result), ensure_ascii=False)
+            sink.write(line.encode("utf-8") + b"\n")
+    return failed
+
+
+def commit_sink(sink, sink_path, next_offset, failed):
+    """Flush the sink to disk, then checkpoint its size."""
+    sink.flush()
+    os.fsync(sink.fileno())
+    write_checkpoint(sink_path, next_offset, os.fstat(sink.fileno()).st_size, failed)
+
+
+def run_job(texts, sink_path, classifier, candidate_labels=CANDIDATE_LABELS, chunk_size=16,
+            checkpoint_every=256, batch_size=None, limit=None):
+    """Classify ``texts`` (positional offsets) into the JSONL sink, resuming from the last checkpoint.
+
+    Reviews the classifier fails on are recorded in the checkpoint and retried
+    on the next run (their entries are then appended out of order).
+    Returns the next offset to process.
+    """
+    sink_path = Path(sink_path)
+    sink_path.parent.mkdir(parents=True, exist_ok=True)
+    batch_size = batch_size or len(candidate_labels)  # all hypotheses of a review in one forward pass
+    texts = list(texts)
+    end = len(texts) if limit is None else min(len(texts), limit)
+
+    offset, committed_bytes, retry = read_checkpoint(sink_path)
+    with open(sink_path, "ab") as sink:
+        sink.truncate(committed_bytes)  # drop records written after the last checkpoint
+        failed = []
+        if retry:
+            for start in range(0, len(retry), chunk_size):
+                failed += classify_offsets(sink, texts, retry[start:start + chunk_size], classifier,
+                                           candidate_labels, batch_size)
+            print(f"Retried {len(retry):,} failed reviews, {len(failed):,} still failing")
+            commit_sink(sink, sink_path, offset, failed)
+
+        since_checkpoint = 0
+        progress = tqdm(total=end, initial=offset, desc="Processing reviews")
+        while offset < end:
+            chunk = range(offset, min(offset + chunk_size, end))
+            failed += classify_offsets(sink, texts, chunk, classifier, candidate_labels, batch_size)
+
+            offset += len(chunk)
+            since_checkpoint += len(chunk)
+            progress.update(len(chunk))
+            if since_checkpoint >= checkpoint_every or offset >= end:
+                commit_sink(sink, sink_path, offset, failed)
+                since_checkpoint = 0
+        progress.close()
+    return offset
+
+
+def zero_shot_model(batch_size=None, **_):
+    """(model_id, model_version, score_batch) for ``pipeline.incremental``: one ``bart_<label>`` score per label."""
+    classifier = load_classifier()
+
+    def score_batch(texts):
+        results = classify_chunk(classifier, texts, CANDIDATE_LABELS, batch_size or len(CANDIDATE_LABELS))
+        return [
+            {f"bart_{label}": score for label, score in zip(result["labels"], result["scores"])} if result else None
+            for result in results
+        ]
+
+    return "bart-large-mnli", "|".join(CANDIDATE_LABELS), score_batch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumable zero-shot classification of the reviews.")
+    parser.add_argument("input_csv", type=Path)
+    parser.add_argument("sink", type=Path, help="append-only JSONL output")
+    parser.add_argument("--text-column", default="clean_reviews")
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--checkpoint-every", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=None, help="hypotheses per forward pass (default: one review)")
+    parser.add_argument("--limit", type=int, default=None, help="stop at this offset")
+    parser.add_argument("--device", type=int, default=-1)
+    args = parser.parse_args()
+
+    reviews = pd.read_csv(args.input_csv)[args.text_column]
+    next_offset = run_job(reviews, args.sink, load_classifier(device=args.device), chunk_size=args.chunk_size,
+                          checkpoint_every=args.checkpoint_every, batch_size=args.batch_size, limit=args.limit)
+    print(f"Committed up to offset {next_offset:,} in {args.sink}")
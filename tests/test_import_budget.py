@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from dashboard.import_profile import IMPORT_BUDGET_RATIO, eager_imports
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# multiple of the pandas + streamlit import time (override on unusual machines)
+RATIO = float(os.environ.get("IMPORT_BUDGET_RATIO", IMPORT_BUDGET_RATIO))
+# appv1 draws its topic chart with matplotlib/seaborn on every run
+MATPLOTLIB_SCRIPTS = ["app/appv1.py"]
+MATPLOTLIB_RATIO = RATIO + 0.5
+
+
+def check_budget(scripts, ratio):
+    result = subprocess.run(
+        [sys.executable, "-m", "dashboard.import_profile", *scripts, "--top", "5", "--relative", str(ratio)],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_dashboards_import_within_budget():
+    scripts = ["app.py", *sorted(str(path.relative_to(ROOT)) for path in (ROOT / "app").glob("*.py"))]
+    check_budget([script for script in scripts if script not in MATPLOTLIB_SCRIPTS], RATIO)
+
+
+def test_matplotlib_dashboards_import_within_budget():
+    check_budget(MATPLOTLIB_SCRIPTS, MATPLOTLIB_RATIO)
+
+
+def test_eager_imports_include_top_level_blocks(tmp_path):
+    script = tmp_path / "script.py"
+    script.write_text(
+        "import pandas\n"
+        "with tab:\n"
+        "    import plotly.express as px\n"
+        "if show:\n"
+        "    pass\n"
+        "else:\n"
+        "    from seaborn import barplot\n"
+        "def render():\n"
+        "    import matplotlib\n"
+    )
+    assert eager_imports(script) == ["import pandas", "import plotly.express as px", "from seaborn import barplot"]
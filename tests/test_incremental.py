@@ -0,0 +1,41 @@
+import pandas as pd
+
+from dashboard.nps import CODE_COLUMN, DETRACTOR, PROMOTER, with_sentiment_codes
+from pipeline.incremental import merge_results, score_incremental
+from pipeline.result_store import ResultStore
+
+
+def test_failed_payloads_are_not_saved_and_retried(tmp_path):
+    store = ResultStore(tmp_path / "results.sqlite")
+    texts = pd.Series(["good", "broken"], index=[10, 11])
+
+    def flaky(batch):
+        return [None if text == "broken" else {"score": 1.0} for text in batch]
+
+    scored, new = score_incremental(texts, flaky, "model", "v1", store)
+    assert new == 2
+    assert scored.loc[10, "score"] == 1.0
+    assert pd.isna(scored.loc[11, "score"])
+    assert store.count("model") == 1
+
+    # the failed review is scored again on the next run
+    scored, new = score_incremental(texts, lambda batch: [{"score": 2.0} for _ in batch], "model", "v1", store)
+    assert new == 1
+    assert scored.loc[11, "score"] == 2.0
+    store.close()
+
+
+def test_merge_keeps_rows_without_results():
+    df = pd.DataFrame({
+        "clean_reviews": ["fine", "awful", None],
+        "pred_sentiment": ["neutral", "negative", "positive"],
+        "RoBERTa_score": [0.5, 0.9, 0.8],
+    })
+    # row 1 failed, row 2 has no text (not scored at all)
+    scored = pd.DataFrame({"pred_sentiment": ["positive", None], "RoBERTa_score": [0.7, None]}, index=[0, 1])
+
+    merged = merge_results(with_sentiment_codes(df), scored)
+
+    assert merged["pred_sentiment"].tolist() == ["positive", "negative", "positive"]
+    assert merged["RoBERTa_score"].tolist() == [0.7, 0.9, 0.8]
+    assert merged[CODE_COLUMN].tolist() == [PROMOTER, DETRACTOR, PROMOTER]
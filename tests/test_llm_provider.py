@@ -0,0 +1,13 @@
+from dashboard.llm_provider import MISTRAL_MODEL, SYS_PROMPT, LLMProvider
+from dashboard.reply_cache import ReplyCache
+
+
+def test_disabled_backend_shows_stored_replies(tmp_path):
+    cache = ReplyCache(tmp_path / "replies.sqlite")
+    cache.put("Great fries", SYS_PROMPT, MISTRAL_MODEL, "Thank you for your review!")
+
+    llm = LLMProvider("disabled")
+
+    assert not llm.enabled
+    assert cache.lookup(["Great fries"], llm.sys_prompt, llm.model_name) == {"Great fries": "Thank you for your review!"}
+    cache.close()
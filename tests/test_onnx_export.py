@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from pipeline import onnx_export
+from pipeline.onnx_export import backend_report, recommended_backend
+
+# backend -> (predicted labels, seconds per review): onnx is fast and exact, onnx-int8 faster but wrong once
+STUB_BACKENDS = {
+    "torch": (["positive", "negative", "neutral", "positive"], 0.004),
+    "onnx": (["positive", "negative", "neutral", "positive"], 0.002),
+    "onnx-int8": (["positive", "negative", "neutral", "negative"], 0.001),
+}
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    """Fake ``time.perf_counter`` of the report, advanced by the stub scorer."""
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(onnx_export, "time", SimpleNamespace(perf_counter=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def stub_scorer(clock):
+    class StubScorer:
+        """``RobertaScorer`` stand-in returning fixed labels at a fixed speed (no model, no torch)."""
+
+        def __init__(self, model_dir, batch_size=32, num_threads=None, backend="torch"):
+            self.labels, self.seconds_per_review = STUB_BACKENDS[backend]
+
+        def score(self, texts):
+            clock.now += self.seconds_per_review * len(texts)
+            return self.labels[:len(texts)], [0.9] * len(texts)
+
+    return StubScorer
+
+
+def labelled_reviews():
+    return pd.DataFrame({
+        "clean_reviews": ["great fries", "cold burger", "it was ok", "nice staff", None],
+        "actual_sentiment": ["Positive", "Negative", "Neutral", "Positive", "Positive"],
+    })
+
+
+def test_report_compares_backends_against_torch(stub_scorer):
+    report = backend_report(labelled_reviews(), backends=list(STUB_BACKENDS), scorer=stub_scorer).set_index("backend")
+
+    assert report.loc["torch", "accuracy"] == 1.0
+    assert report.loc["onnx-int8", "accuracy"] == 0.75
+    assert report.loc["onnx-int8", "accuracy_drop"] == 0.25
+    assert report.loc["onnx", "reviews_per_sec"] == pytest.approx(500)
+    assert report["within_tolerance"].to_dict() == {"onnx-int8": False, "onnx": True, "torch": True}
+
+
+def test_recommends_fastest_backend_within_tolerance(stub_scorer):
+    report = backend_report(labelled_reviews(), backends=list(STUB_BACKENDS), scorer=stub_scorer)
+    assert report["backend"].tolist() == ["onnx-int8", "onnx", "torch"]
+    assert recommended_backend(report) == "onnx"
+
+    lenient = backend_report(labelled_reviews(), backends=list(STUB_BACKENDS), tolerance=0.3, scorer=stub_scorer)
+    assert recommended_backend(lenient) == "onnx-int8"
@@ -0,0 +1,17 @@
+from dashboard.reply_cache import ReplyCache
+
+
+def test_lookup_counts_hits_and_refreshes_lru(tmp_path):
+    cache = ReplyCache(tmp_path / "replies.sqlite", max_entries=2)
+    cache.put("shown", "prompt", "model", "reply 1")
+    cache.put("other", "prompt", "model", "reply 2")
+
+    assert cache.lookup(["shown", "missing"], "prompt", "model") == {"shown": "reply 1"}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 0
+
+    # the reply shown through lookup is the most recently used: "other" is evicted
+    cache.put("new", "prompt", "model", "reply 3")
+    assert set(cache.lookup(["shown", "other", "new"], "prompt", "model", count=False)) == {"shown", "new"}
+    assert cache.stats()["hits"] == 1
+    cache.close()
@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+
+from dashboard.nps import CODE_COLUMN, PROMOTER
+from dashboard.topic_index import TopicBitmapIndex
+
+
+def test_unfiltered_bits_stop_at_the_last_row():
+    n_rows = 70  # two words, 58 padding bits
+    df = pd.DataFrame({"service": np.linspace(0, 1, n_rows), CODE_COLUMN: PROMOTER})
+    index = TopicBitmapIndex(df, ["service"], [0.5])
+
+    assert index.count() == n_rows
+    assert index.count(code=PROMOTER) == n_rows
+    assert index.rows().tolist() == list(range(n_rows))
+    assert index.count(label="service") == int((df["service"] > 0.5).sum())
@@ -0,0 +1,35 @@
+import json
+
+from pipeline.zero_shot_job import read_checkpoint, run_job
+
+
+class FlakyClassifier:
+    """Zero-shot stand-in that fails on the reviews listed in ``broken``."""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+
+    def __call__(self, reviews, candidate_labels, **_):
+        if isinstance(reviews, list):
+            return [self(review, candidate_labels) for review in reviews]
+        if reviews in self.broken:
+            raise RuntimeError("classifier failed")
+        return {"labels": list(candidate_labels), "scores": [0.5] * len(candidate_labels)}
+
+
+def sink_offsets(sink):
+    return [json.loads(line)["offset"] for line in sink.read_text(encoding="utf-8").splitlines()]
+
+
+def test_failed_reviews_are_retried_on_resume(tmp_path):
+    sink = tmp_path / "classified.jsonl"
+    texts = ["good", "broken", None, "fine"]
+
+    assert run_job(texts, sink, FlakyClassifier(broken={"broken"}), candidate_labels=["food"], chunk_size=2) == 4
+    assert sink_offsets(sink) == [0, 3]
+    assert read_checkpoint(sink) == (4, sink.stat().st_size, [1])
+
+    # the next run retries the failed review before resuming at the checkpoint offset
+    assert run_job(texts, sink, FlakyClassifier(), candidate_labels=["food"], chunk_size=2) == 4
+    assert sink_offsets(sink) == [0, 3, 1]
+    assert read_checkpoint(sink) == (4, sink.stat().st_size, [])